@@ -3,17 +3,67 @@ MyRDBMS REST API Server
 Provides HTTP interface to the database engine
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, send_from_directory, abort
 from flask_cors import CORS
-from engine import Database, Storage
+from werkzeug.exceptions import HTTPException
+from flask.json.provider import DefaultJSONProvider
+from engine import Database, Storage, ParseError
+from engine.parser import SelectQuery
+from collections import OrderedDict
 import os
+import sys
+import gzip
+import threading
 import traceback
 
 app = Flask(__name__)
 CORS(app)
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson's C encoder"""
+    
+    # Settings for the stdlib fallback, matching orjson's output
+    sort_keys = False
+    compact = True
+    
+    def dumps(self, obj, **kwargs):
+        # Types orjson can't encode go through Flask's usual default()
+        try:
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers wider than 64 bits, which the json module handles
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+else:
+    app.json.sort_keys = False
+    app.json.compact = True
+
+# The web UI is served by this app; resolve it independently of the cwd
+WEB_UI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'web-ui')
+
+# Databases have always lived in web-ui/data (main.py used to chdir into web-ui)
+DATA_DIR = os.path.join(WEB_UI_DIR, 'data')
+
 # Initialize storage
-storage = Storage()
+storage = Storage(DATA_DIR)
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 300
+
+# JSON bodies smaller than this aren't worth compressing
+GZIP_MIN_SIZE = 500
+
+def debug_requested() -> bool:
+    """Werkzeug debug mode is opt-in via MYRDBMS_DEBUG=1 or --debug"""
+    return os.environ.get('MYRDBMS_DEBUG') == '1' or '--debug' in sys.argv
 
 # ==================== DATABASE ENDPOINTS ====================
 
@@ -59,6 +109,8 @@ def delete_database(db_name):
         if os.path.exists(db_path):
             import shutil
             shutil.rmtree(db_path)
+            storage.invalidate_database(db_name)
+            invalidate_results(db_name)
             return jsonify({
                 'success': True,
                 'message': f'Database {db_name} deleted'
@@ -182,6 +234,7 @@ def drop_table(db_name, table_name):
         }), 404
     
     success = storage.delete_table(db_name, table_name)
+    invalidate_results(db_name, table_name)
     if success:
         return jsonify({
             'success': True,
@@ -193,6 +246,50 @@ def drop_table(db_name, table_name):
             'error': f'Table {table_name} not found'
         }), 404
 
+# ==================== RESULT CACHE ====================
+
+# Successful SELECT results keyed by (db, SQL text), LRU-bounded. Each entry
+# records the tables it read so writes through the API can evict it.
+RESULT_CACHE_SIZE = 256
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+_result_generation = 0  # Bumped on every eviction; guards against racing writes
+
+def _tables_read(parsed) -> frozenset:
+    """Tables a parsed SELECT reads"""
+    tables = {parsed.table_name}
+    if parsed.join_clause:
+        tables.add(parsed.join_clause['table'])
+    return frozenset(tables)
+
+def _cached_result(db_name: str, query: str):
+    """Get a cached SELECT result, or None"""
+    key = (db_name, query.strip())
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        _result_cache.move_to_end(key)
+        return entry[1]
+
+def _store_result(db_name: str, query: str, tables: frozenset, result: dict, generation: int):
+    """Cache a SELECT result unless a write happened while it ran"""
+    with _result_cache_lock:
+        if generation != _result_generation:
+            return
+        _result_cache[(db_name, query.strip())] = (tables, result)
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+def invalidate_results(db_name: str, table_name: str = None):
+    """Evict cached results of a database, or only those reading one table"""
+    global _result_generation
+    with _result_cache_lock:
+        _result_generation += 1
+        for key, (tables, _) in list(_result_cache.items()):
+            if key[0] == db_name and (table_name is None or table_name in tables):
+                del _result_cache[key]
+
 # ==================== QUERY EXECUTION ENDPOINTS ====================
 
 @app.route('/api/databases/<db_name>/execute', methods=['POST'])
@@ -221,13 +318,31 @@ def execute_query(db_name):
     
     try:
         # Create database instance and execute query
-        db = Database(db_name)
+        db = Database(db_name, storage)
+        try:
+            parsed = db.parse(query)
+        except ParseError:
+            parsed = None  # execute() reports the error
+        
+        is_select = isinstance(parsed, SelectQuery)
+        if is_select:
+            cached = _cached_result(db_name, query)
+            if cached is not None:
+                return jsonify(cached)
+            generation = _result_generation
+        
         result = db.execute(query)
         
         # Ensure consistent response format
         if 'success' not in result:
             result['success'] = 'error' not in result
         
+        if is_select:
+            if result['success']:
+                _store_result(db_name, query, _tables_read(parsed), result, generation)
+        elif parsed is not None:
+            invalidate_results(db_name, parsed.table_name)
+        
         return jsonify(result)
         
     except Exception as e:
@@ -262,12 +377,13 @@ def execute_batch_queries(db_name):
         }), 404
     
     try:
-        db = Database(db_name)
+        db = Database(db_name, storage)
         results = []
         
         for query in queries:
             result = db.execute(query)
             results.append(result)
+        invalidate_results(db_name)
         
         return jsonify({
             'success': True,
@@ -293,7 +409,7 @@ def get_database_stats(db_name):
         }), 404
     
     try:
-        db = Database(db_name)
+        db = Database(db_name, storage)
         stats = db.get_stats()
         
         return jsonify({
@@ -332,7 +448,7 @@ def explain_query(db_name):
         }), 404
     
     try:
-        db = Database(db_name)
+        db = Database(db_name, storage)
         plan = db.explain(query)
         
         return jsonify({
@@ -362,7 +478,7 @@ def list_table_indexes(db_name, table_name):
         }), 404
     
     try:
-        db = Database(db_name)
+        db = Database(db_name, storage)
         indexes = db.list_indexes(table_name)
         
         return jsonify({
@@ -409,7 +525,7 @@ def create_table_index(db_name, table_name):
         }), 404
     
     try:
-        db = Database(db_name)
+        db = Database(db_name, storage)
         success = db.create_index(table_name, column, index_type)
         
         if success:
@@ -483,11 +599,51 @@ def api_info():
             },
             'system': {
                 'GET /api/health': 'Health check',
-                'GET /api/info': 'API information'
+                'GET /api/info': 'API information',
+                'POST /api/batch': 'Run several GET requests in one round trip'
             }
         }
     })
 
+@app.route('/api/batch', methods=['POST'])
+def batch_get():
+    """Run a JSON list of GET paths and return every response in order"""
+    paths = request.get_json(silent=True)
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        return jsonify({
+            'success': False,
+            'error': 'JSON list of GET paths required'
+        }), 400
+    
+    adapter = app.url_map.bind('localhost')
+    responses = []
+    for path in paths:
+        # Paths may be given relative to /api, like the client's BASE_URL,
+        # with or without a leading slash; any query string is kept apart
+        route_path, _, query_string = path.partition('?')
+        if not route_path.startswith('/'):
+            route_path = '/' + route_path
+        full_path = route_path if route_path.startswith('/api/') else '/api' + route_path
+        # Each sub-request sees its own path and query arguments
+        with app.test_request_context(full_path, method='GET', query_string=query_string):
+            try:
+                endpoint, args = adapter.match(full_path, method='GET')
+                response = app.make_response(app.view_functions[endpoint](**args))
+            except HTTPException as e:
+                response = app.make_response(app.handle_http_exception(e))
+        
+        responses.append({
+            'path': path,
+            'status': response.status_code,
+            'body': response.get_json(silent=True)
+        })
+    
+    return jsonify({
+        'success': True,
+        'responses': responses,
+        'count': len(responses)
+    })
+
 @app.route('/api/debug', methods=['GET'])
 def debug_info():
     """Debug information (only in debug mode)"""
@@ -497,7 +653,6 @@ def debug_info():
             'error': 'Debug endpoint only available in debug mode'
         }), 403
     
-    import sys
     import platform
     
     return jsonify({
@@ -512,6 +667,48 @@ def debug_info():
         'flask_debug': app.debug
     })
 
+@app.route('/api/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+def api_not_found(endpoint):
+    """Unknown API paths are a JSON 404 for every method, not a static-file 405"""
+    return jsonify({
+        'success': False,
+        'error': f'Unknown API endpoint: /api/{endpoint}'
+    }), 404
+
+# ==================== WEB UI ====================
+
+@app.route('/', methods=['GET'])
+def web_ui_index():
+    """Serve the web interface"""
+    return send_from_directory(WEB_UI_DIR, 'index.html')
+
+@app.route('/<path:filename>', methods=['GET'])
+def web_ui_file(filename):
+    """Serve web interface assets (never stray database files under web-ui/data)"""
+    if filename.split('/', 1)[0] in ('api', 'data'):
+        abort(404)
+    return send_from_directory(WEB_UI_DIR, filename)
+
+# ==================== RESPONSE COMPRESSION ====================
+
+@app.after_request
+def gzip_json_response(response):
+    """Gzip larger JSON responses for clients that accept it"""
+    if (response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 # ==================== ERROR HANDLERS ====================
 
 @app.errorhandler(404)
@@ -555,4 +752,4 @@ if __name__ == '__main__':
     os.makedirs(storage.data_dir, exist_ok=True)
     
     # Run the server
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+    app.run(debug=debug_requested(), port=5000, host='0.0.0.0', threaded=True)
\ No newline at end of file
@@ -3,14 +3,20 @@ Main Database class - Facade for MyRDBMS
 """
 
 import time
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from engine.storage import Storage
-from engine.parser import SQLParser
+from engine.parser import SQLParser, ParsedQuery
 from engine.query_executor import QueryExecutor
 from engine.index_manager import IndexManager
 from engine.types import QueryResult
 from engine.errors import MyRDBMSError, ParseError, ExecutionError
 
+@lru_cache(maxsize=1024)
+def _parse_cached(query: str) -> ParsedQuery:
+    """Parse each distinct statement once; executors treat parsed queries as read-only"""
+    return SQLParser.parse(query)
+
 class Database:
     """
     Main database interface with separated concerns.
@@ -21,11 +27,14 @@ class Database:
                     Results ←-----------------------------
     """
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, storage: Optional[Storage] = None):
         self.name = name
-        self.storage = Storage()
+        # Sharing a Storage lets its row and schema caches outlive this facade
+        self.storage = storage if storage is not None else Storage()
         self.parser = SQLParser()
         self.index_manager = IndexManager(self.storage)
+        # Long-lived so its schema cache survives across queries
+        self.executor = QueryExecutor(self.storage, name)
         
         # Ensure database exists
         if not self.storage.database_exists(name):
@@ -38,12 +47,11 @@ class Database:
         start_time = time.time()
         
         try:
-            # 1. Parse
-            parsed_query = self.parser.parse(query)
+            # 1. Parse (repeated statements hit the cache)
+            parsed_query = self.parse(query)
             
-            # 2. Execute - QueryExecutor only takes storage and db_name
-            executor = QueryExecutor(self.storage, self.name)
-            result = executor.execute(parsed_query)
+            # 2. Execute
+            result = self.executor.execute(parsed_query)
             
             # 3. Format results
             execution_time = time.time() - start_time
@@ -73,6 +81,10 @@ class Database:
                 execution_time=time.time() - start_time
             ).to_dict()
     
+    def parse(self, query: str) -> ParsedQuery:
+        """Parse a statement through the shared statement cache"""
+        return _parse_cached(query.strip())
+    
     def explain(self, query: str) -> Dict[str, Any]:
         """Show execution plan for query"""
         try:
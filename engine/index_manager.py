@@ -5,7 +5,9 @@ Handles creation and use of indexes
 
 import pickle
 import os
+from array import array
 from typing import Dict, List, Any
+from engine.storage import PICKLE_PROTOCOL, IO_BUFFER_SIZE
 
 class IndexManager:
     """Manages database indexes for faster lookups"""
@@ -18,26 +20,23 @@ class IndexManager:
         # Get all rows
         rows = self.storage.get_all_rows(db_name, table_name)
         
-        # Build index (hash map)
+        # Build index (hash map of packed int64 row positions)
         index = {}
         for i, row in enumerate(rows):
             key = row.get(column)
             if key is not None:  # Skip NULL values
                 if key not in index:
-                    index[key] = []
+                    index[key] = array('q')
                 index[key].append(i)
         
         # Save index
-        index_dir = os.path.join(
-            self.storage._get_db_path(db_name), 
-            table_name
-        )
-        os.makedirs(index_dir, exist_ok=True)
+        paths = self.storage._table_paths(db_name, table_name)
+        os.makedirs(paths.dir, exist_ok=True)
         
-        index_file = os.path.join(index_dir, f'index_{column}.pkl')
+        index_file = paths.index(column)
         
-        with open(index_file, 'wb') as f:
-            pickle.dump(index, f)
+        with open(index_file, 'wb', buffering=IO_BUFFER_SIZE) as f:
+            pickle.dump(index, f, protocol=PICKLE_PROTOCOL)
         
         return True
     
@@ -45,16 +44,12 @@ class IndexManager:
                     column: str, value: Any) -> List[Dict]:
         """Get rows using index"""
         # Load index
-        index_file = os.path.join(
-            self.storage._get_db_path(db_name),
-            table_name,
-            f'index_{column}.pkl'
-        )
+        index_file = self.storage._table_paths(db_name, table_name).index(column)
         
         if not os.path.exists(index_file):
             return []  # No index
         
-        with open(index_file, 'rb') as f:
+        with open(index_file, 'rb', buffering=IO_BUFFER_SIZE) as f:
             index = pickle.load(f)
         
         if value not in index:
@@ -68,11 +63,7 @@ class IndexManager:
     
     def drop_index(self, db_name: str, table_name: str, column: str) -> bool:
         """Remove an index"""
-        index_file = os.path.join(
-            self.storage._get_db_path(db_name),
-            table_name,
-            f'index_{column}.pkl'
-        )
+        index_file = self.storage._table_paths(db_name, table_name).index(column)
         
         if os.path.exists(index_file):
             os.remove(index_file)
@@ -82,7 +73,7 @@ class IndexManager:
     
     def list_indexes(self, db_name: str, table_name: str) -> List[str]:
         """List all indexes for a table"""
-        table_dir = os.path.join(self.storage._get_db_path(db_name), table_name)
+        table_dir = self.storage._table_paths(db_name, table_name).dir
         if not os.path.exists(table_dir):
             return []
         
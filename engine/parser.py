@@ -9,6 +9,20 @@ from dataclasses import dataclass
 from engine.types import DataType, ConstraintType, ColumnDefinition
 from engine.errors import ParseError
 
+# Statement patterns, compiled once at import
+_CREATE_TABLE_RE = re.compile(r'CREATE TABLE\s+(\w+)\s*\((.*)\)', re.IGNORECASE | re.DOTALL)
+_COLUMN_SPLIT_RE = re.compile(r',\s*(?![^()]*\))')
+_INSERT_RE = re.compile(r'INSERT INTO\s+(\w+)\s+VALUES\s*\((.*)\)', re.IGNORECASE | re.DOTALL)
+_TYPE_LENGTH_RE = re.compile(r'(\w+)\((\d+)\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SELECT_RE = re.compile(r'SELECT\s+(.+?)\s+FROM', re.IGNORECASE)
+_GROUP_BY_RE = re.compile(r'GROUP BY\s+(\w+)', re.IGNORECASE)
+_ORDER_BY_RE = re.compile(r'ORDER BY\s+(.+?)(?:\s+(?:LIMIT|$))', re.IGNORECASE)
+_LIMIT_RE = re.compile(r'LIMIT\s+(\d+)', re.IGNORECASE)
+_UPDATE_RE = re.compile(r'UPDATE\s+(\w+)\s+SET\s+(.+?)(?:\s+WHERE\s+(.+))?$', re.IGNORECASE)
+_DELETE_RE = re.compile(r'DELETE FROM\s+(\w+)(?:\s+WHERE\s+(.+))?$', re.IGNORECASE)
+_DROP_TABLE_RE = re.compile(r'DROP TABLE\s+(\w+)', re.IGNORECASE)
+
 @dataclass
 class ParsedQuery:
     """Base class for parsed queries"""
@@ -25,6 +39,7 @@ class InsertQuery(ParsedQuery):
     """Parsed INSERT query"""
     table_name: str
     values: List[Any]
+    rows: Optional[List[List[Any]]] = None  # All rows of a multi-row INSERT
 
 @dataclass
 class SelectQuery(ParsedQuery):
@@ -83,8 +98,7 @@ class SQLParser:
     def _parse_create_table(query: str) -> CreateTableQuery:
         """Parse CREATE TABLE query"""
         # Extract table name and columns
-        pattern = r'CREATE TABLE\s+(\w+)\s*\((.*)\)'
-        match = re.match(pattern, query, re.IGNORECASE | re.DOTALL)
+        match = _CREATE_TABLE_RE.match(query)
         
         if not match:
             raise ParseError("Invalid CREATE TABLE syntax")
@@ -94,7 +108,7 @@ class SQLParser:
         
         # Parse columns
         columns = []
-        for col_def in re.split(r',\s*(?![^()]*\))', columns_text):
+        for col_def in _COLUMN_SPLIT_RE.split(columns_text):
             col_def = col_def.strip()
             if not col_def:
                 continue
@@ -157,47 +171,68 @@ class SQLParser:
     @staticmethod
     def _parse_insert(query: str) -> InsertQuery:
         """Parse INSERT query"""
-        pattern = r'INSERT INTO\s+(\w+)\s+VALUES\s*\((.*)\)'
-        match = re.match(pattern, query, re.IGNORECASE | re.DOTALL)
+        match = _INSERT_RE.match(query)
         
         if not match:
             raise ParseError("Invalid INSERT syntax")
+        if query[match.end():].strip() not in ('', ';'):
+            raise ParseError("Unexpected text after INSERT values")
         
         table_name = match.group(1).strip()
         values_text = match.group(2).strip()
         
-        # Parse values
+        # Parse values; "(...), (...)" gives one value list per row
         values = []
+        rows = [values]
         current = ''
         in_quotes = False
         paren_depth = 0
+        separated = False
         
         for char in values_text:
-            if char == "'" and not in_quotes:
-                in_quotes = True
+            if paren_depth < 0:
+                # Between rows: only whitespace and a single comma
+                if char == '(' and separated:
+                    values = []
+                    rows.append(values)
+                    paren_depth = 0
+                    separated = False
+                elif char == ',' and not separated:
+                    separated = True
+                elif not char.isspace():
+                    raise ParseError(f"Unexpected {char!r} between INSERT rows")
+            elif char == "'":
+                in_quotes = not in_quotes
                 current += char
-            elif char == "'" and in_quotes:
-                in_quotes = False
+            elif in_quotes:
                 current += char
             elif char == '(':
                 paren_depth += 1
                 current += char
+            elif char == ')' and paren_depth == 0:
+                # Closes the current row
+                values.append(SQLParser._parse_value(current.strip()))
+                current = ''
+                paren_depth = -1
             elif char == ')':
                 paren_depth -= 1
                 current += char
-            elif char == ',' and not in_quotes and paren_depth == 0:
+            elif char == ',' and paren_depth == 0:
                 values.append(SQLParser._parse_value(current.strip()))
                 current = ''
             else:
                 current += char
         
+        if paren_depth < 0:
+            raise ParseError("Expected a row after ',' in INSERT")
         if current:
             values.append(SQLParser._parse_value(current.strip()))
         
         return InsertQuery(
             query_type='INSERT',
             table_name=table_name,
-            values=values
+            values=rows[0],
+            rows=rows
         )
     
     @staticmethod
@@ -225,7 +260,7 @@ class SQLParser:
     @staticmethod
     def _extract_max_length(data_type: str) -> Optional[int]:
         """Extract max length from data type like VARCHAR(50)"""
-        match = re.match(r'(\w+)\((\d+)\)', data_type.upper())
+        match = _TYPE_LENGTH_RE.match(data_type.upper())
         if match:
             try:
                 return int(match.group(2))
@@ -236,10 +271,10 @@ class SQLParser:
     @staticmethod
     def _parse_select(query: str) -> SelectQuery:
         """Parse SELECT query with JOIN, WHERE, GROUP BY support"""
-        query = re.sub(r'\s+', ' ', query).strip()
+        query = _WHITESPACE_RE.sub(' ', query).strip()
         
         # Extract SELECT columns
-        select_match = re.match(r'SELECT\s+(.+?)\s+FROM', query, re.IGNORECASE)
+        select_match = _SELECT_RE.match(query)
         if not select_match:
             raise ParseError("Invalid SELECT syntax")
         
@@ -337,19 +372,19 @@ class SQLParser:
         
         # Look for GROUP BY
         if 'GROUP BY' in from_part.upper():
-            group_match = re.search(r'GROUP BY\s+(\w+)', from_part, re.IGNORECASE)
+            group_match = _GROUP_BY_RE.search(from_part)
             if group_match:
                 group_by = group_match.group(1)
         
         # Look for ORDER BY
         if 'ORDER BY' in from_part.upper():
-            order_match = re.search(r'ORDER BY\s+(.+?)(?:\s+(?:LIMIT|$))', from_part, re.IGNORECASE)
+            order_match = _ORDER_BY_RE.search(from_part)
             if order_match:
                 order_by = order_match.group(1).strip()
         
         # Look for LIMIT
         if 'LIMIT' in from_part.upper():
-            limit_match = re.search(r'LIMIT\s+(\d+)', from_part, re.IGNORECASE)
+            limit_match = _LIMIT_RE.search(from_part)
             if limit_match:
                 try:
                     limit = int(limit_match.group(1))
@@ -370,8 +405,7 @@ class SQLParser:
     @staticmethod
     def _parse_update(query: str) -> UpdateQuery:
         """Parse UPDATE query"""
-        pattern = r'UPDATE\s+(\w+)\s+SET\s+(.+?)(?:\s+WHERE\s+(.+))?$'
-        match = re.match(pattern, query, re.IGNORECASE)
+        match = _UPDATE_RE.match(query)
         
         if not match:
             raise ParseError("Invalid UPDATE syntax")
@@ -398,8 +432,7 @@ class SQLParser:
     @staticmethod
     def _parse_delete(query: str) -> DeleteQuery:
         """Parse DELETE query"""
-        pattern = r'DELETE FROM\s+(\w+)(?:\s+WHERE\s+(.+))?$'
-        match = re.match(pattern, query, re.IGNORECASE)
+        match = _DELETE_RE.match(query)
         
         if not match:
             raise ParseError("Invalid DELETE syntax")
@@ -416,8 +449,7 @@ class SQLParser:
     @staticmethod
     def _parse_drop_table(query: str) -> DropTableQuery:
         """Parse DROP TABLE query"""
-        pattern = r'DROP TABLE\s+(\w+)'
-        match = re.match(pattern, query, re.IGNORECASE)
+        match = _DROP_TABLE_RE.match(query)
         
         if not match:
             raise ParseError("Invalid DROP TABLE syntax")
@@ -5,16 +5,68 @@ Handles execution of parsed queries
 
 import re
 import time
-from typing import Dict, List, Any
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from engine.parser import *
 from engine.storage import Storage
+from engine.types import DataType, SchemaMeta
 from engine.join_executor import JoinExecutor
 from engine.index_manager import IndexManager
 from engine.errors import ExecutionError
+from engine.where import compile_where
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for overlapping independent table loads (e.g. both JOIN sides)
+_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='myrdbms-io')
+
+def _to_int(value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return value
+
+def _to_float(value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return value
+
+def _to_bool(value: Any) -> Any:
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() in ['true', '1', 'yes', 't']
+    return bool(value)
+
+def _to_str(value: Any) -> Any:
+    return None if value is None else str(value)
+
+# Column type -> value converter used when building INSERT rows
+_CONVERTERS = {
+    DataType.INT: _to_int,
+    DataType.DECIMAL: _to_float,
+    DataType.BOOLEAN: _to_bool,
+}
+
+def _make_row_builder(column_names: List[str], column_types: List[DataType]) -> Callable[[List[Any]], Dict]:
+    """Specialize row construction for one schema (TEXT, VARCHAR, etc. become str)"""
+    plan = tuple(
+        (name, _CONVERTERS.get(col_type, _to_str))
+        for name, col_type in zip(column_names, column_types)
+    )
+    
+    def build_row(values: List[Any]) -> Dict[str, Any]:
+        return {name: convert(value) for (name, convert), value in zip(plan, values)}
+    
+    return build_row
+
 class QueryExecutor:
     """Executes parsed queries against storage"""
     
@@ -22,24 +74,25 @@ class QueryExecutor:
         self.storage = storage
         self.db_name = db_name
         self.index_manager = IndexManager(storage)  # Initialize here
+        
+        # Query class -> handler, looked up once per query
+        self._dispatch = {
+            CreateTableQuery: self._execute_create_table,
+            InsertQuery: self._execute_insert,
+            SelectQuery: self._execute_select,
+            UpdateQuery: self._execute_update,
+            DeleteQuery: self._execute_delete,
+            DropTableQuery: self._execute_drop_table,
+        }
     
     def execute(self, parsed_query: ParsedQuery) -> Dict[str, Any]:
         """Execute a parsed query"""
         start_time = time.time()
         
         try:
-            if isinstance(parsed_query, CreateTableQuery):
-                result = self._execute_create_table(parsed_query)
-            elif isinstance(parsed_query, InsertQuery):
-                result = self._execute_insert(parsed_query)
-            elif isinstance(parsed_query, SelectQuery):
-                result = self._execute_select(parsed_query)
-            elif isinstance(parsed_query, UpdateQuery):
-                result = self._execute_update(parsed_query)
-            elif isinstance(parsed_query, DeleteQuery):
-                result = self._execute_delete(parsed_query)
-            elif isinstance(parsed_query, DropTableQuery):
-                result = self._execute_drop_table(parsed_query)
+            handler = self._dispatch.get(type(parsed_query))
+            if handler:
+                result = handler(parsed_query)
             else:
                 result = {'error': f'Unsupported query type: {type(parsed_query).__name__}'}
             
@@ -57,6 +110,15 @@ class QueryExecutor:
         except Exception as e:
             raise ExecutionError(f"Query execution failed: {str(e)}")
     
+    def _row_builder(self, meta: SchemaMeta) -> Callable[[List[Any]], Dict]:
+        """Get the row builder for a schema, kept on the storage's SchemaMeta"""
+        build_row = meta.plans.get('build_row')
+        if build_row is None:
+            column_types = [meta.col_types[name] for name in meta.column_names]
+            build_row = _make_row_builder(list(meta.column_names), column_types)
+            meta.plans['build_row'] = build_row
+        return build_row
+    
     def _execute_create_table(self, query: CreateTableQuery) -> Dict[str, Any]:
         """Execute CREATE TABLE"""
         try:
@@ -105,71 +167,58 @@ class QueryExecutor:
         """Execute INSERT"""
         try:
             # Get schema to map values to columns
-            schema = self.storage.load_table_schema(self.db_name, query.table_name)
+            meta = self.storage.schema_meta(self.db_name, query.table_name)
             
-            if not schema or 'columns' not in schema:
+            if not meta:
                 return {'error': f'Table {query.table_name} not found or has no schema'}
             
-            column_defs = schema.get('columns', [])
-            column_names = [col['name'] for col in column_defs]
-            
-            if len(query.values) != len(column_names):
-                return {'error': f'Expected {len(column_names)} values, got {len(query.values)}'}
-            
-            # Create row dict with proper type conversion
-            row = {}
-            for i, (col_name, col_def) in enumerate(zip(column_names, column_defs)):
-                value = query.values[i]
-                col_type = col_def.get('type', 'TEXT').upper()
+            column_names = meta.column_names
+            build_row = self._row_builder(meta)
+            
+            # Load existing rows once per statement for all UNIQUE checks
+            unique_values = {col_name: set() for col_name in meta.unique}
+            if unique_values:
+                for existing_row in self.storage.iter_rows(self.db_name, query.table_name):
+                    for col_name, seen in unique_values.items():
+                        seen.add(existing_row.get(col_name))
+            
+            # Validate every row first so a multi-row INSERT is all-or-nothing
+            new_rows = []
+            for values in query.rows or [query.values]:
+                if len(values) != len(column_names):
+                    return {'error': f'Expected {len(column_names)} values, got {len(values)}'}
                 
-                # Convert value based on column type
-                if value is None:
-                    row[col_name] = None
-                elif col_type == 'INT':
-                    try:
-                        row[col_name] = int(value)
-                    except:
-                        row[col_name] = value
-                elif col_type == 'DECIMAL':
-                    try:
-                        row[col_name] = float(value)
-                    except:
-                        row[col_name] = value
-                elif col_type == 'BOOLEAN':
-                    if isinstance(value, bool):
-                        row[col_name] = value
-                    elif isinstance(value, str):
-                        row[col_name] = value.lower() in ['true', '1', 'yes', 't']
-                    else:
-                        row[col_name] = bool(value)
-                else:  # TEXT, VARCHAR, etc.
-                    row[col_name] = str(value)
-            
-            # Validate constraints
-            for col_def in column_defs:
-                col_name = col_def['name']
-                constraints = col_def.get('constraints', [])
+                # Create row dict with proper type conversion
+                row = build_row(values)
                 
-                # Check NOT NULL
-                if 'NOT NULL' in constraints and col_name in row and row[col_name] is None:
-                    return {'error': f'Column {col_name} cannot be NULL'}
+                # Validate constraints
+                for col_name in meta.not_null:
+                    if col_name in row and row[col_name] is None:
+                        return {'error': f'Column {col_name} cannot be NULL'}
                 
-                # Check UNIQUE (basic check - would need full table scan in production)
-                if 'UNIQUE' in constraints and col_name in row:
-                    all_rows = self.storage.get_all_rows(self.db_name, query.table_name)
-                    for existing_row in all_rows:
-                        if existing_row.get(col_name) == row[col_name]:
-                            return {'error': f'Duplicate value for unique column {col_name}'}
-            
-            # Insert into storage
-            success = self.storage.insert_row(self.db_name, query.table_name, row)
-            if success:
+                # Check UNIQUE against existing rows and earlier rows of this statement
+                for col_name, seen in unique_values.items():
+                    if col_name in row and row[col_name] in seen:
+                        return {'error': f'Duplicate value for unique column {col_name}'}
+                
+                for col_name, seen in unique_values.items():
+                    seen.add(row.get(col_name))
+                new_rows.append(row)
+            
+            # Insert into storage with one write for the whole statement
+            success = self.storage.insert_rows(self.db_name, query.table_name, new_rows)
+            if not success:
+                return {'error': 'Failed to insert row'}
+            
+            if len(new_rows) == 1:
                 return {
                     'message': '1 row inserted',
-                    'row': row
+                    'row': new_rows[0]
                 }
-            else:
-                return {'error': 'Failed to insert row'}
+            return {
+                'message': f'{len(new_rows)} rows inserted',
+                'count': len(new_rows)
+            }
                 
         except Exception as e:
             return {'error': f'Error inserting row: {str(e)}'}
@@ -181,42 +230,60 @@ class QueryExecutor:
             if not self.storage.table_exists(self.db_name, query.table_name):
                 return {'error': f'Table {query.table_name} not found'}
             
-            # Get all rows
-            rows = self.storage.get_all_rows(self.db_name, query.table_name)
-            
-            # Apply JOIN if present
-            if query.join_clause and query.join_clause.get('table'):
-                join_result = self._execute_join(rows, query)
-                if 'error' in join_result:
-                    return join_result
-                rows = join_result.get('rows', rows)
+            predicate = compile_where(query.where_clause) if query.where_clause else None
+            if query.where_clause and predicate is None:
+                return {'error': f'Invalid WHERE clause: {query.where_clause}'}
             
-            # Apply WHERE clause
-            if query.where_clause:
-                rows = self._apply_where(rows, query.where_clause)
+            if self._can_push_limit(query):
+                # Stop scanning once LIMIT matching rows have been found
+                rows = self._scan_rows(query.table_name, predicate, query.limit)
+            else:
+                # Load the JOIN table concurrently with the main table
+                right_future = None
+                if query.join_clause and query.join_clause.get('table'):
+                    right_future = _io_pool.submit(
+                        self.storage.get_all_rows, self.db_name, query.join_clause['table']
+                    )
+                
+                # Get all rows
+                rows = self.storage.get_all_rows(self.db_name, query.table_name)
+                
+                # Apply JOIN if present
+                if right_future is not None:
+                    join_result = self._execute_join(rows, query, right_future.result())
+                    if 'error' in join_result:
+                        return join_result
+                    rows = join_result.get('rows', rows)
+                
+                # Apply WHERE clause
+                if predicate is not None:
+                    rows = self._apply_where(rows, predicate)
             
             # Apply GROUP BY
             if query.group_by:
                 rows = self._apply_group_by(rows, query.group_by, query.columns)
             
             # Select specific columns
-            if query.columns != ['*']:
-                filtered_rows = []
-                for row in rows:
-                    filtered_row = {}
-                    for col in query.columns:
-                        if col in row:
-                            filtered_row[col] = row[col]
-                        else:
-                            # Handle aggregation functions like COUNT(*)
-                            if col.upper().startswith('COUNT'):
-                                filtered_row[col] = len(rows)
-                    filtered_rows.append(filtered_row)
-                rows = filtered_rows
+            if query.columns != ['*'] and rows:
+                # Decide once whether each column is copied or counted
+                sample = rows[0]
+                plan = []
+                for col in query.columns:
+                    if col in sample:
+                        plan.append((col, False))
+                    elif col.upper().startswith('COUNT'):
+                        # Handle aggregation functions like COUNT(*)
+                        plan.append((col, True))
+                
+                total = len(rows)
+                rows = [
+                    {col: total if is_count else row.get(col) for col, is_count in plan}
+                    for row in rows
+                ]
             
             # Apply ORDER BY
             if query.order_by:
-                rows = self._apply_order_by(rows, query.order_by)
+                rows = self._apply_order_by(rows, query.order_by, query.limit)
             
             # Apply LIMIT
             if query.limit:
@@ -237,7 +304,25 @@ class QueryExecutor:
         except Exception as e:
             return {'error': f'Error executing SELECT: {str(e)}'}
     
-    def _execute_join(self, left_rows: List[Dict], query: SelectQuery) -> Dict[str, Any]:
+    def _can_push_limit(self, query: SelectQuery) -> bool:
+        """Check whether LIMIT can be applied while scanning the table"""
+        if not query.limit or query.order_by or query.group_by or query.join_clause:
+            return False
+        # COUNT(...) projections need every matching row
+        return not any(col.upper().startswith('COUNT') for col in query.columns)
+    
+    def _scan_rows(self, table_name: str, predicate: Optional[Callable], limit: int) -> List[Dict]:
+        """Scan a table, returning at most `limit` rows matching WHERE"""
+        rows = []
+        for row in self.storage.iter_rows(self.db_name, table_name):
+            if predicate is None or predicate(row):
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+        return rows
+    
+    def _execute_join(self, left_rows: List[Dict], query: SelectQuery,
+                      right_rows: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Execute JOIN operation - IMPROVED VERSION"""
         try:
             join_clause = query.join_clause
@@ -247,8 +332,9 @@ class QueryExecutor:
             right_table = join_clause['table']
             on_clause = join_clause.get('on', '')
             
-            # Get rows from right table
-            right_rows = self.storage.get_all_rows(self.db_name, right_table)
+            # Get rows from right table unless the caller already loaded them
+            if right_rows is None:
+                right_rows = self.storage.get_all_rows(self.db_name, right_table)
             
             if not right_rows:
                 return {
@@ -297,35 +383,53 @@ class QueryExecutor:
                     else:
                         return {'error': f'Column {right_col} not found in right table {right_table}'}
             
+            # Refuse the cartesian product a missing ON clause would produce
+            if not left_col or not right_col:
+                return {
+                    'error': f'JOIN without valid ON clause refused (would produce cartesian '
+                             f'product of {len(left_rows)}*{len(right_rows)} rows)'
+                }
+            
+            # Work out the merged column layout once for the whole join
+            projection = self._plan_merge(
+                left_rows[0].keys() if left_rows else [],
+                right_rows[0].keys(),
+                right_table,
+                query.columns
+            )
+            
             # Perform join
             joined_rows = []
             
-            if not left_col or not right_col:
-                # Cartesian product (no valid ON clause)
-                logger.warning(f'No valid ON clause, performing cartesian product')
-                for left_row in left_rows:
-                    for right_row in right_rows:
-                        merged = self._merge_rows(left_row, right_row, right_table, query.columns)
-                        joined_rows.append(merged)
+            # INNER JOIN with ON clause
+            # Build the lookup on the smaller table and probe with the larger
+            swapped = len(right_rows) > len(left_rows)
+            if swapped:
+                build_rows, build_col = left_rows, left_col
+                probe_rows, probe_col = right_rows, right_col
             else:
-                # INNER JOIN with ON clause
-                # Create lookup for right table for faster matching
-                right_lookup = {}
-                for right_row in right_rows:
-                    key = str(right_row.get(right_col, ''))
-                    if key not in right_lookup:
-                        right_lookup[key] = []
-                    right_lookup[key].append(right_row)
+                build_rows, build_col = right_rows, right_col
+                probe_rows, probe_col = left_rows, left_col
+            
+            lookup = {}
+            for build_row in build_rows:
+                key = str(build_row.get(build_col, ''))
+                if key not in lookup:
+                    lookup[key] = []
+                lookup[key].append(build_row)
+            
+            # Perform join using lookup
+            for probe_row in probe_rows:
+                probe_key = str(probe_row.get(probe_col, ''))
                 
-                # Perform join using lookup
-                for left_row in left_rows:
-                    left_key = str(left_row.get(left_col, ''))
-                    
-                    if left_key in right_lookup:
-                        for right_row in right_lookup[left_key]:
-                            merged = self._merge_rows(left_row, right_row, right_table, query.columns)
-                            joined_rows.append(merged)
-                    # Note: For INNER JOIN, skip rows with no match
+                if probe_key in lookup:
+                    for build_row in lookup[probe_key]:
+                        # Keep left/right order so the result schema is stable
+                        sources = (build_row, probe_row) if swapped else (probe_row, build_row)
+                        joined_rows.append({
+                            out: sources[side].get(key) for out, side, key in projection
+                        })
+                # Note: For INNER JOIN, skip rows with no match
             
             # Get column names for result
             columns = []
@@ -343,16 +447,21 @@ class QueryExecutor:
             logger.error(f"JOIN execution error: {str(e)}", exc_info=True)
             return {'error': f'JOIN execution error: {str(e)}'}
 
-    def _merge_rows(self, left_row: Dict, right_row: Dict, right_table: str, selected_columns: List[str]) -> Dict:
-        """Merge rows from two tables, handling column name conflicts"""
+    def _plan_merge(self, left_keys, right_keys, right_table: str,
+                    selected_columns: List[str]) -> List[Tuple[str, int, str]]:
+        """
+        Plan how joined rows are built, handling column name conflicts.
+        Returns (output column, side, source key) triples where side is
+        0 for the left row and 1 for the right row.
+        """
         merged = {}
         
         # Add left table columns
-        for key, value in left_row.items():
-            merged[key] = value
+        for key in left_keys:
+            merged[key] = (0, key)
         
         # Add right table columns
-        for key, value in right_row.items():
+        for key in right_keys:
             new_key = key
             
             # Check for column name conflict
@@ -360,7 +469,7 @@ class QueryExecutor:
                 # Add table prefix to avoid conflict
                 new_key = f"{right_table}_{key}"
             
-            merged[new_key] = value
+            merged[new_key] = (1, key)
         
         # If specific columns were selected, filter to only those
         if selected_columns and selected_columns != ['*']:
@@ -378,105 +487,19 @@ class QueryExecutor:
                     filtered[col] = merged[col]
             
             # Also include columns without table prefix if they match
-            for key, value in merged.items():
+            for key, source in merged.items():
                 if '_' in key:
                     col_part = key.split('_', 1)[1]
                     if col_part in selected_columns and col_part not in filtered:
-                        filtered[col_part] = value
-            
-            return filtered
-        
-        return merged
-    def _apply_where(self, rows: List[Dict], where_clause: str) -> List[Dict]:
-        """Apply WHERE clause filtering with smart type handling"""
-        if not where_clause:
-            return rows
-        
-        # Parse WHERE clause
-        operators = ['!=', '>=', '<=', '=', '>', '<']  # Order matters for multi-char operators
-        op_found = None
-        col = None
-        value = None
-        
-        for op in operators:
-            if op in where_clause:
-                parts = where_clause.split(op)
-                if len(parts) == 2:
-                    col = parts[0].strip()
-                    raw_value = parts[1].strip()
-                    # Remove quotes if present
-                    if (raw_value.startswith("'") and raw_value.endswith("'")) or \
-                    (raw_value.startswith('"') and raw_value.endswith('"')):
-                        value = raw_value[1:-1]
-                    else:
-                        value = raw_value
-                    op_found = op
-                    break
-        
-        if not op_found or not col:
-            return rows  # No valid operator found
-        
-        filtered = []
-        
-        for row in rows:
-            row_value = row.get(col)
-            
-            # Skip if row doesn't have this column
-            if col not in row:
-                continue
+                        filtered[col_part] = source
             
-            # Smart comparison based on data types
-            try:
-                # Try numeric comparison
-                num_row = float(row_value) if row_value is not None else None
-                num_val = float(value) if value is not None else None
-                
-                if num_row is not None and num_val is not None:
-                    # Numeric comparison
-                    if op_found == '=' and num_row == num_val:
-                        filtered.append(row)
-                    elif op_found == '!=' and num_row != num_val:
-                        filtered.append(row)
-                    elif op_found == '>' and num_row > num_val:
-                        filtered.append(row)
-                    elif op_found == '<' and num_row < num_val:
-                        filtered.append(row)
-                    elif op_found == '>=' and num_row >= num_val:
-                        filtered.append(row)
-                    elif op_found == '<=' and num_row <= num_val:
-                        filtered.append(row)
-                else:
-                    # Fall back to string comparison
-                    str_row = str(row_value) if row_value is not None else ''
-                    str_val = str(value) if value is not None else ''
-                    
-                    if op_found == '=' and str_row == str_val:
-                        filtered.append(row)
-                    elif op_found == '!=' and str_row != str_val:
-                        filtered.append(row)
-                    elif op_found == '>' and str_row > str_val:
-                        filtered.append(row)
-                    elif op_found == '<' and str_row < str_val:
-                        filtered.append(row)
-                    elif op_found == '>=' and str_row >= str_val:
-                        filtered.append(row)
-                    elif op_found == '<=' and str_row <= str_val:
-                        filtered.append(row)
-                        
-            except (ValueError, TypeError):
-                # Last resort: string comparison
-                str_row = str(row_value) if row_value is not None else ''
-                str_val = str(value) if value is not None else ''
-                
-                if op_found == '=' and str_row == str_val:
-                    filtered.append(row)
-                elif op_found == '!=' and str_row != str_val:
-                    filtered.append(row)
+            merged = filtered
         
-        return filtered
-        
-        # If no operator found, return original rows
-        return rows
+        return [(out, side, key) for out, (side, key) in merged.items()]
+    
+    def _apply_where(self, rows: List[Dict], predicate: Callable) -> List[Dict]:
+        """Apply a compiled WHERE predicate with smart type handling"""
+        return [row for row in rows if predicate(row)]
     
     def _apply_group_by(self, rows: List[Dict], group_by: str, columns: List[str]) -> List[Dict]:
         """Apply GROUP BY with basic aggregation"""
@@ -531,8 +554,9 @@ class QueryExecutor:
         
         return result
     
-    def _apply_order_by(self, rows: List[Dict], order_by: str) -> List[Dict]:
-        """Apply ORDER BY sorting"""
+    def _apply_order_by(self, rows: List[Dict], order_by: str,
+                        limit: Optional[int] = None) -> List[Dict]:
+        """Apply ORDER BY sorting, keeping only the top `limit` rows if given"""
         if not rows:
             return rows
         
@@ -547,6 +571,10 @@ class QueryExecutor:
         
         # Sort rows
         try:
+            if limit:
+                # Top-k selection: O(N log k) instead of a full sort
+                select = heapq.nsmallest if ascending else heapq.nlargest
+                return select(limit, rows, key=lambda x: x.get(order_by, ''))
             return sorted(rows, 
                          key=lambda x: x.get(order_by, ''), 
                          reverse=not ascending)
@@ -554,22 +582,24 @@ class QueryExecutor:
             return rows  # Return unsorted if error
     
     def _execute_update(self, query: UpdateQuery) -> Dict[str, Any]:
-        """Execute UPDATE with detailed debugging"""
+        """Execute UPDATE"""
         try:
-            print(f"\n=== DEBUG UPDATE START ===")
-            print(f"Database: {self.db_name}, Table: {query.table_name}")
-            print(f"WHERE: {query.where_clause}")
-            print(f"SET: {query.set_clause}")
+            logger.debug("UPDATE %s.%s SET %s WHERE %s",
+                         self.db_name, query.table_name, query.set_clause, query.where_clause)
+            
+            predicate = compile_where(query.where_clause) if query.where_clause else None
+            if query.where_clause and predicate is None:
+                return {
+                    'success': False,
+                    'error': f'Invalid WHERE clause: {query.where_clause}',
+                    'message': 'Update failed: invalid WHERE clause'
+                }
             
             # 1. Get current rows
             rows = self.storage.get_all_rows(self.db_name, query.table_name)
-            print(f"DEBUG: Retrieved {len(rows)} rows from storage")
-            
-            if rows:
-                print(f"DEBUG: First row before update: {rows[0]}")
+            logger.debug("Retrieved %d rows from storage", len(rows))
             
             if not rows:
-                print("DEBUG: No rows found")
                 return {
                     'success': True,
                     'message': '0 rows updated',
@@ -578,152 +608,35 @@ class QueryExecutor:
                     'data': []
                 }
             
-            # 2. Make a DEEP COPY to track changes
-            import copy
-            rows_before = copy.deepcopy(rows)
-            
-            # 3. Apply updates
+            # 2. Apply updates
             updated_count = 0
             updated_indices = []
             
             for i, row in enumerate(rows):
-                should_update = True
+                if predicate is not None and not predicate(row):
+                    continue
                 
-                if query.where_clause:
-                    if '=' in query.where_clause:
-                        col, value = query.where_clause.split('=', 1)
-                        col = col.strip()
-                        value = value.strip().strip("'\"")
-                        
-                        row_value = str(row.get(col, ''))
-                        print(f"DEBUG: Row {i} - WHERE check: {col} = {value} vs row value: {row_value}")
-                        
-                        if row_value != value:
-                            should_update = False
-                            print(f"DEBUG: Row {i} doesn't match WHERE, skipping")
+                # Copy before mutating: storage hands out its cached row dicts
+                row = rows[i] = dict(row)
+                for col, new_value in query.set_clause.items():
+                    row[col] = new_value
                 
-                if should_update:
-                    print(f"DEBUG: Row {i} matches WHERE, updating...")
-                    print(f"DEBUG: Before update: {row}")
-                    
-                    for col, new_value in query.set_clause.items():
-                        old_value = row.get(col)
-                        row[col] = new_value
-                        print(f"DEBUG:   Changed {col}: {old_value} -> {new_value}")
-                    
-                    updated_count += 1
-                    updated_indices.append(i)
-                    print(f"DEBUG: After update: {row}")
+                updated_count += 1
+                updated_indices.append(i)
             
-            print(f"DEBUG: Total rows to update: {updated_count}")
-            print(f"DEBUG: Updated indices: {updated_indices}")
-            
-            # 4. Verify changes were made in memory
-            if updated_count > 0:
-                print("\nDEBUG: Verifying in-memory changes:")
-                for i in updated_indices:
-                    print(f"Row {i} before: {rows_before[i]}")
-                    print(f"Row {i} after:  {rows[i]}")
-                    print(f"Changed: {rows_before[i] != rows[i]}")
+            logger.debug("Rows to update: %d (indices %s)", updated_count, updated_indices)
             
-            # 5. Save back to storage
+            # 3. Save back to storage (only the changed rows)
             if updated_count > 0:
-                print(f"\nDEBUG: Attempting to save {len(rows)} rows...")
-                
-                # Check what save methods are available
-                storage_methods = [m for m in dir(self.storage) if 'save' in m.lower() and not m.startswith('_')]
-                print(f"DEBUG: Available save methods: {storage_methods}")
-                
-                saved = False
-                
-                # Try save_all_rows
-                if 'save_all_rows' in storage_methods:
-                    print("DEBUG: Trying save_all_rows...")
-                    try:
-                        result = self.storage.save_all_rows(self.db_name, query.table_name, rows)
-                        saved = True
-                        print(f"DEBUG: save_all_rows returned: {result}")
-                    except Exception as e:
-                        print(f"DEBUG: save_all_rows failed: {e}")
-                
-                # Try save_rows
-                if not saved and 'save_rows' in storage_methods:
-                    print("DEBUG: Trying save_rows...")
-                    try:
-                        result = self.storage.save_rows(self.db_name, query.table_name, rows)
-                        saved = True
-                        print(f"DEBUG: save_rows returned: {result}")
-                    except Exception as e:
-                        print(f"DEBUG: save_rows failed: {e}")
-                
-                # Try to find and call ANY save method
-                if not saved and storage_methods:
-                    print(f"DEBUG: Trying other save methods...")
-                    for method_name in storage_methods:
-                        try:
-                            method = getattr(self.storage, method_name)
-                            # Check if it takes appropriate parameters
-                            import inspect
-                            params = inspect.signature(method).parameters
-                            if len(params) >= 3:  # Should take db_name, table_name, data
-                                print(f"DEBUG: Calling {method_name}...")
-                                result = method(self.db_name, query.table_name, rows)
-                                saved = True
-                                print(f"DEBUG: {method_name} returned: {result}")
-                                break
-                        except Exception as e:
-                            print(f"DEBUG: {method_name} failed: {e}")
-                
-                # Last resort: direct file writing
-                if not saved:
-                    print("DEBUG: All save methods failed, trying direct file write...")
-                    try:
-                        # Try to find where data is stored
-                        import json
-                        import os
-                        
-                        # Common data locations
-                        possible_dirs = [
-                            "data", "databases", "db", "storage",
-                            os.path.join(os.getcwd(), "data"),
-                            os.path.join(os.getcwd(), "databases"),
-                        ]
-                        
-                        for data_dir in possible_dirs:
-                            filepath = os.path.join(data_dir, self.db_name, f"{query.table_name}.json")
-                            print(f"DEBUG: Trying path: {filepath}")
-                            
-                            if os.path.exists(os.path.dirname(filepath)):
-                                # Write the file
-                                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                                with open(filepath, 'w') as f:
-                                    json.dump(rows, f, indent=2)
-                                
-                                saved = True
-                                print(f"DEBUG: Direct write succeeded to {filepath}")
-                                
-                                # Verify
-                                with open(filepath, 'r') as f:
-                                    verify_data = json.load(f)
-                                print(f"DEBUG: Verified {len(verify_data)} rows written")
-                                break
-                    except Exception as e:
-                        print(f"DEBUG: Direct write failed: {e}")
-                
-                if not saved:
-                    print("ERROR: Could not save data by any method!")
+                updates = [{'index': i, 'row': rows[i]} for i in updated_indices]
+                if not self.storage.update_rows(self.db_name, query.table_name, updates):
+                    logger.error("Could not save updated rows for %s.%s", self.db_name, query.table_name)
                     return {
                         'success': False,
                         'error': 'Failed to save updated data',
                         'message': f'Updated {updated_count} rows but could not save changes',
                         'count': updated_count
                     }
-                else:
-                    print("DEBUG: Data saved successfully")
-            else:
-                print("DEBUG: No rows needed updating")
-            
-            print(f"=== DEBUG UPDATE END ===\n")
             
             return {
                 'success': True,
@@ -735,9 +648,7 @@ class QueryExecutor:
             }
             
         except Exception as e:
-            print(f"UPDATE ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("UPDATE failed: %s", e, exc_info=True)
             
             return {
                 'success': False,
@@ -748,6 +659,10 @@ class QueryExecutor:
     def _execute_delete(self, query: DeleteQuery) -> Dict[str, Any]:
         """Execute DELETE"""
         try:
+            predicate = compile_where(query.where_clause) if query.where_clause else None
+            if query.where_clause and predicate is None:
+                return {'error': f'Invalid WHERE clause: {query.where_clause}'}
+            
             # Get all rows
             rows = self.storage.get_all_rows(self.db_name, query.table_name)
             if not rows:
@@ -759,15 +674,9 @@ class QueryExecutor:
             
             for row in rows:
                 # Check WHERE clause
-                if query.where_clause:
-                    # Simple WHERE evaluation
-                    if '=' in query.where_clause:
-                        col, value = query.where_clause.split('=', 1)
-                        col = col.strip()
-                        value = value.strip().strip("'\"")
-                        if str(row.get(col, '')) == value:
-                            deleted_count += 1
-                            continue
+                if predicate is None or predicate(row):
+                    deleted_count += 1
+                    continue
                 
                 remaining_rows.append(row)
             
@@ -6,15 +6,110 @@ Handles file I/O and persistence
 import os
 import json
 import pickle
-from typing import Dict, List, Any, Optional
-from engine.types import TableSchema, ColumnDefinition, ConstraintType, DataType
+import mmap
+import threading
+import logging
+import tempfile
+import struct
+import zlib
+from typing import Dict, List, Any, Optional, Iterator, Tuple, NamedTuple
+from engine.types import TableSchema, ColumnDefinition, ConstraintType, DataType, SchemaMeta
 from engine.errors import StorageError, TableNotFoundError
 
+logger = logging.getLogger(__name__)
+
+# Binary framed pickles are smaller and faster than the default protocol
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+IO_BUFFER_SIZE = 1 << 20
+
+# Log frame header: magic, payload length, payload crc32, then a crc32 of those
+# three so a damaged length can't pass for a frame cut short by a crash.
+# Pickles start with b'\x80', so frames written before headers still load.
+FRAME_MAGIC = b'MRF1'
+FRAME_HEADER = struct.Struct('<4sQI')
+FRAME_HEADER_SIZE = FRAME_HEADER.size + 4
+
+def encode_frame(frame: Any) -> bytes:
+    """Pickle a frame behind its length + checksum header"""
+    payload = pickle.dumps(frame, protocol=PICKLE_PROTOCOL)
+    header = FRAME_HEADER.pack(FRAME_MAGIC, len(payload), zlib.crc32(payload))
+    return header + struct.pack('<I', zlib.crc32(header)) + payload
+
+# mkstemp creates files 0600; atomic writes restore the usual umask-based mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def write_atomic(path: str, data: bytes):
+    """Replace a file's contents via temp file + fsync + rename so a crash never truncates it"""
+    # Unique temp name in the same directory so concurrent writers never share one
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f'.{name}.', suffix='.tmp')
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    # Persist the rename itself (not supported on every platform)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+class _TablePaths(NamedTuple):
+    """Precomputed file locations of one table"""
+    dir: str
+    schema: str
+    data: str
+    delta: str
+    
+    def index(self, column: str) -> str:
+        return os.path.join(self.dir, f'index_{column}.pkl')
+
+def _read_small(path: str) -> bytes:
+    """Read a small file whole with raw fd calls, bypassing the io stack"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 4096))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
 class Storage:
     """File-based storage engine"""
     
     def __init__(self, data_dir='./data'):
         self.data_dir = data_dir
+        # (db, table) -> (file versions, rows) for unchanged data files
+        self._row_cache: Dict[Tuple[str, str], Tuple[Tuple, List[Dict]]] = {}
+        # (db, table) -> schema; schemas only change through DDL
+        self._schema_cache: Dict[Tuple[str, str], Dict] = {}
+        self._meta_cache: Dict[Tuple[str, str], Optional[SchemaMeta]] = {}
+        self._paths: Dict[Tuple[str, str], _TablePaths] = {}
+        # log path -> ((mtime_ns, size), end offset of its last complete frame)
+        self._log_ends: Dict[str, Tuple[Tuple[int, int], int]] = {}
+        # Serializes appends and compaction so a torn-tail check can't race a writer
+        self._write_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
@@ -35,6 +130,17 @@ class Storage:
                    if os.path.isdir(os.path.join(self.data_dir, d))]
         return []
     
+    def invalidate_database(self, db_name: str):
+        """Forget cached rows and schemas of a database removed behind our back"""
+        with self._schema_lock:
+            for key in [k for k in self._schema_cache if k[0] == db_name]:
+                del self._schema_cache[key]
+                self._meta_cache.pop(key, None)
+        for key in [k for k in self._row_cache if k[0] == db_name]:
+            self._row_cache.pop(key, None)
+        for key in [k for k in self._paths if k[0] == db_name]:
+            self._paths.pop(key, None)
+    
     def database_exists(self, db_name: str) -> bool:
         """Check if database exists"""
         return os.path.exists(os.path.join(self.data_dir, db_name))
@@ -42,13 +148,14 @@ class Storage:
     # Table operations
     def save_table_schema(self, db_name: str, table_name: str, schema: Dict):
         """Save table schema to disk"""
-        table_dir = os.path.join(self._get_db_path(db_name), table_name)
-        if not os.path.exists(table_dir):
-            os.makedirs(table_dir)
+        paths = self._table_paths(db_name, table_name)
+        if not os.path.exists(paths.dir):
+            os.makedirs(paths.dir)
         
-        schema_path = os.path.join(table_dir, 'schema.json')
-        with open(schema_path, 'w') as f:
-            json.dump(self._serialize_schema(schema), f, indent=2)
+        with self._schema_lock:
+            write_atomic(paths.schema, json.dumps(self._serialize_schema(schema)).encode())
+            self._schema_cache.pop((db_name, table_name), None)
+            self._meta_cache.pop((db_name, table_name), None)
         
         # Update metadata
         meta = self._load_metadata(db_name)
@@ -57,12 +164,36 @@ class Storage:
             self._save_metadata(db_name, meta)
     
     def load_table_schema(self, db_name: str, table_name: str) -> Optional[Dict]:
-        """Load table schema from disk"""
-        schema_path = os.path.join(self._get_db_path(db_name), table_name, 'schema.json')
-        if os.path.exists(schema_path):
-            with open(schema_path, 'r') as f:
-                return self._deserialize_schema(json.load(f))
-        return None
+        """Load table schema, reading schema.json only on a cache miss"""
+        key = (db_name, table_name)
+        cached = self._schema_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        schema_path = self._table_paths(db_name, table_name).schema
+        with self._schema_lock:
+            try:
+                raw = _read_small(schema_path)
+            except FileNotFoundError:
+                return None
+            schema = self._deserialize_schema(json.loads(raw))
+            self._schema_cache[key] = schema
+            return schema
+    
+    def schema_meta(self, db_name: str, table_name: str) -> Optional[SchemaMeta]:
+        """Get the precomputed column facts for a table (None if no valid schema)"""
+        key = (db_name, table_name)
+        if key in self._meta_cache:
+            return self._meta_cache[key]
+        
+        schema = self.load_table_schema(db_name, table_name)
+        if schema is None:
+            return None
+        meta = SchemaMeta.from_dict(schema)
+        with self._schema_lock:
+            if key in self._schema_cache:
+                self._meta_cache[key] = meta
+        return meta
     
     def _serialize_schema(self, schema: Dict) -> Dict:
         """Serialize schema for JSON storage"""
@@ -83,66 +214,239 @@ class Storage:
         return schema_dict  # Add type conversion if needed
     
     # Data operations
+    #
+    # data.pkl is an append-only log of frames (see encode_frame), each a
+    # pickled list of rows. Inserts append a frame. update_rows appends {position: row} frames to
+    # delta.pkl, which readers overlay on data.pkl; once the deltas outweigh
+    # the data both are compacted into a single data.pkl frame.
+    # Files written before the log format hold a single frame and still load.
     def insert_row(self, db_name: str, table_name: str, row: Dict) -> bool:
         """Insert a row into table"""
-        data_file = os.path.join(self._get_db_path(db_name), table_name, 'data.pkl')
-        
-        # Load existing data
-        data = []
-        if os.path.exists(data_file):
-            try:
-                with open(data_file, 'rb') as f:
-                    data = pickle.load(f)
-            except:
-                data = []
-        
-        # Append new row
-        data.append(row)
+        return self.insert_rows(db_name, table_name, [row])
+    
+    def insert_rows(self, db_name: str, table_name: str, rows: List[Dict]) -> bool:
+        """Insert several rows into table with a single appended frame"""
+        data_file = self._table_paths(db_name, table_name).data
         
-        # Save back
-        with open(data_file, 'wb') as f:
-            pickle.dump(data, f)
+        # Append a frame instead of rewriting every existing row
+        self._row_cache.pop((db_name, table_name), None)
+        with self._write_lock:
+            self._append_frame(data_file, rows)
         
         return True
     
+    def _append_frame(self, path: str, frame: Any):
+        """Append one frame to a log, first cutting off any torn tail"""
+        good_end = self._log_end(path)
+        with open(path, 'ab', buffering=IO_BUFFER_SIZE) as f:
+            if os.fstat(f.fileno()).st_size > good_end:
+                # A crashed append left a partial frame; appending after it
+                # would make every later frame unreadable
+                self._set_aside_tail(path, good_end)
+                f.truncate(good_end)
+            f.write(encode_frame(frame))
+            # One fsync per statement, however many rows it wrote
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        self._log_ends[path] = ((st.st_mtime_ns, st.st_size), st.st_size)
+    
+    def _set_aside_tail(self, path: str, offset: int):
+        """Copy the unreadable tail of a log to <path>.torn before it is cut off"""
+        with open(path, 'rb') as src:
+            src.seek(offset)
+            tail = src.read()
+        with open(path + '.torn', 'ab') as dst:
+            dst.write(tail)
+        logger.warning("Truncated %d unreadable bytes at offset %d of %s (kept in %s.torn)",
+                       len(tail), offset, path, path)
+    
+    def _log_end(self, path: str) -> int:
+        """Offset just past the last complete frame of a log file"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        known = self._log_ends.get(path)
+        if known is not None and known[0] == (st.st_mtime_ns, st.st_size):
+            return known[1]
+        
+        # Unknown file state: scan it, which records where the frames end
+        for _ in self._read_log(path):
+            pass
+        return self._log_ends[path][1]
+    
     def get_all_rows(self, db_name: str, table_name: str) -> List[Dict]:
-        """Get all rows from a table"""
-        data_file = os.path.join(self._get_db_path(db_name), table_name, 'data.pkl')
-        if os.path.exists(data_file):
-            try:
-                with open(data_file, 'rb') as f:
-                    return pickle.load(f)
-            except:
-                return []
-        return []
+        """Get all rows from a table (cached until the data file changes)"""
+        paths = self._table_paths(db_name, table_name)
+        try:
+            version = self._data_version(paths)
+        except OSError:
+            return []
+        
+        key = (db_name, table_name)
+        cached = self._row_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return list(cached[1])
+        
+        rows = list(self._read_frames(paths))
+        self._row_cache[key] = (version, rows)
+        return list(rows)
+    
+    def iter_rows(self, db_name: str, table_name: str) -> Iterator[Dict]:
+        """Iterate over rows of a table frame by frame, letting callers stop early"""
+        paths = self._table_paths(db_name, table_name)
+        try:
+            version = self._data_version(paths)
+        except OSError:
+            return
+        
+        cached = self._row_cache.get((db_name, table_name))
+        if cached is not None and cached[0] == version:
+            yield from cached[1]
+        else:
+            yield from self._read_frames(paths)
+    
+    def _data_version(self, paths: _TablePaths) -> Tuple:
+        """Identify a table's contents by modification time and size of its files"""
+        st = os.stat(paths.data)
+        try:
+            delta_st = os.stat(paths.delta)
+            delta_version = (delta_st.st_mtime_ns, delta_st.st_size)
+        except FileNotFoundError:
+            delta_version = None
+        return st.st_mtime_ns, st.st_size, delta_version
+    
+    def _read_log(self, path: str) -> Iterator[Any]:
+        """Yield the pickled frames of an append-only log file"""
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            version = (st.st_mtime_ns, st.st_size)
+            if st.st_size == 0:
+                self._log_ends[path] = (version, 0)
+                return  # mmap refuses empty files
+            
+            # Unpickle straight from the page cache instead of read() copies
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                size = len(mm)
+                good_end = 0
+                while good_end < size:
+                    if mm[good_end:good_end + 1] != FRAME_MAGIC[:1]:
+                        # Frame from before headers: a bare pickle
+                        mm.seek(good_end)
+                        try:
+                            frame = pickle.load(mm)
+                        except Exception as e:
+                            raise StorageError(f"Corrupt frame at offset {good_end} of {path}: {e}")
+                        yield frame
+                        good_end = mm.tell()
+                        continue
+                    
+                    frame_end = self._frame_end(view, good_end, path)
+                    if frame_end is None:
+                        # Torn tail (crash mid-append): keep what loaded;
+                        # the next append truncates it
+                        break
+                    yield self._decode_frame(view, good_end, frame_end, path)
+                    good_end = frame_end
+            self._log_ends[path] = (version, good_end)
+    
+    @staticmethod
+    def _frame_end(view: memoryview, offset: int, path: str) -> Optional[int]:
+        """End offset of the headered frame at offset (None if cut short)"""
+        size = len(view)
+        if size - offset < FRAME_HEADER_SIZE:
+            if FRAME_MAGIC.startswith(bytes(view[offset:offset + len(FRAME_MAGIC)])):
+                return None
+            raise StorageError(f"Corrupt frame header at offset {offset} of {path}")
+        
+        header_end = offset + FRAME_HEADER.size
+        magic, length, _ = FRAME_HEADER.unpack_from(view, offset)
+        (header_crc,) = struct.unpack_from('<I', view, header_end)
+        if magic != FRAME_MAGIC or zlib.crc32(view[offset:header_end]) != header_crc:
+            raise StorageError(f"Corrupt frame header at offset {offset} of {path}")
+        
+        frame_end = offset + FRAME_HEADER_SIZE + length
+        return frame_end if frame_end <= size else None
+    
+    @staticmethod
+    def _decode_frame(view: memoryview, offset: int, frame_end: int, path: str) -> Any:
+        """Check a headered frame's payload checksum and unpickle it"""
+        _, _, payload_crc = FRAME_HEADER.unpack_from(view, offset)
+        payload = view[offset + FRAME_HEADER_SIZE:frame_end]
+        try:
+            if zlib.crc32(payload) != payload_crc:
+                raise StorageError(f"Checksum mismatch in frame at offset {offset} of {path}")
+            return pickle.loads(payload)
+        except StorageError:
+            raise
+        except Exception as e:
+            raise StorageError(f"Corrupt frame at offset {offset} of {path}: {e}")
+        finally:
+            payload.release()
+    
+    def _read_frames(self, paths: _TablePaths) -> Iterator[Dict]:
+        """Replay the frames of a data file with its deltas, yielding rows in order"""
+        deltas = {}
+        if os.path.exists(paths.delta):
+            for frame in self._read_log(paths.delta):
+                deltas.update(frame)
+        
+        if not deltas:
+            for frame in self._read_log(paths.data):
+                yield from frame
+            return
+        
+        position = 0
+        for frame in self._read_log(paths.data):
+            for row in frame:
+                yield deltas.get(position, row)
+                position += 1
     
     def update_rows(self, db_name: str, table_name: str, 
                    updates: List[Dict]) -> bool:
-        """Update rows in table"""
-        data_file = os.path.join(self._get_db_path(db_name), table_name, 'data.pkl')
+        """Update rows in table by appending only the changed rows"""
+        paths = self._table_paths(db_name, table_name)
+        if not os.path.exists(paths.data):
+            return False
         
-        if os.path.exists(data_file):
-            with open(data_file, 'rb') as f:
-                data = pickle.load(f)
-            
-            # Apply updates
-            for update in updates:
-                idx = update.get('index')
-                new_row = update.get('row')
-                if idx is not None and idx < len(data) and new_row:
-                    data[idx] = new_row
-            
-            # Save back
-            with open(data_file, 'wb') as f:
-                pickle.dump(data, f)
-            
+        delta = {
+            update['index']: update['row']
+            for update in updates
+            if update.get('index') is not None and update.get('row')
+        }
+        if not delta:
             return True
         
-        return False
+        self._row_cache.pop((db_name, table_name), None)
+        with self._write_lock:
+            self._append_frame(paths.delta, delta)
+            
+            # Fold the deltas back in once they outweigh the data they patch
+            if os.path.getsize(paths.delta) > os.path.getsize(paths.data):
+                self._compact(paths)
+        
+        return True
+    
+    def _compact(self, paths: _TablePaths):
+        """Rewrite a data file as a single frame with its deltas applied"""
+        data = list(self._read_frames(paths))
+        write_atomic(paths.data, encode_frame(data))
+        # Replaying leftover deltas over compacted data is harmless if we crash here
+        os.remove(paths.delta)
+        self._log_ends.pop(paths.delta, None)
     
     def delete_table(self, db_name: str, table_name: str) -> bool:
         """Delete a table and all its data"""
-        table_dir = os.path.join(self._get_db_path(db_name), table_name)
+        table_dir = self._table_paths(db_name, table_name).dir
+        paths = self._paths.pop((db_name, table_name), None)
+        if paths is not None:
+            self._log_ends.pop(paths.data, None)
+            self._log_ends.pop(paths.delta, None)
+        self._row_cache.pop((db_name, table_name), None)
+        with self._schema_lock:
+            self._schema_cache.pop((db_name, table_name), None)
+            self._meta_cache.pop((db_name, table_name), None)
         if os.path.exists(table_dir):
             import shutil
             shutil.rmtree(table_dir)
@@ -159,21 +463,33 @@ class Storage:
     def _get_db_path(self, db_name: str) -> str:
         return os.path.join(self.data_dir, db_name)
     
+    def _table_paths(self, db_name: str, table_name: str) -> _TablePaths:
+        """Get a table's file paths, joining them only on first use"""
+        key = (db_name, table_name)
+        paths = self._paths.get(key)
+        if paths is None:
+            table_dir = os.path.join(self._get_db_path(db_name), table_name)
+            paths = self._paths[key] = _TablePaths(
+                dir=table_dir,
+                schema=os.path.join(table_dir, 'schema.json'),
+                data=os.path.join(table_dir, 'data.pkl'),
+                delta=os.path.join(table_dir, 'delta.pkl')
+            )
+        return paths
+    
     def _save_metadata(self, db_name: str, metadata: Dict):
         """Save database metadata"""
         meta_path = os.path.join(self._get_db_path(db_name), 'meta.json')
-        with open(meta_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_atomic(meta_path, json.dumps(metadata).encode())
     
     def _load_metadata(self, db_name: str) -> Dict:
         """Load database metadata"""
         meta_path = os.path.join(self._get_db_path(db_name), 'meta.json')
-        if os.path.exists(meta_path):
-            with open(meta_path, 'r') as f:
-                return json.load(f)
-        return {'tables': []}
+        try:
+            return json.loads(_read_small(meta_path))
+        except FileNotFoundError:
+            return {'tables': []}
     
     def table_exists(self, db_name: str, table_name: str) -> bool:
         """Check if table exists"""
-        table_dir = os.path.join(self._get_db_path(db_name), table_name)
-        return os.path.exists(table_dir)
\ No newline at end of file
+        return os.path.exists(self._table_paths(db_name, table_name).dir)
\ No newline at end of file
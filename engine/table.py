@@ -2,9 +2,10 @@
 Table class with schema validation and row operations
 """
 
-from typing import Dict, List, Any, Optional
-from engine.types import TableSchema, ColumnDefinition, ConstraintType, DataType
+from typing import Dict, List, Any, Optional, Set
+from engine.types import TableSchema, ColumnDefinition, DataType, SchemaMeta
 from engine.errors import ConstraintError, SchemaError
+from engine.where import compile_where, parse_where, coerce_value
 
 class Table:
     """In-memory table representation with validation"""
@@ -12,8 +13,14 @@ class Table:
     def __init__(self, name: str, schema: TableSchema):
         self.name = name
         self.schema = schema
-        self.rows: List[Dict[str, Any]] = []
-        self.indexes = {}
+        # Rows keyed by a stable, monotonically assigned rowid; indexes map
+        # value -> set of rowids so deletes never renumber anything
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[Any, Set[int]]] = {}
+        self._next_rowid = 0
+        self._pk_set = set()  # Primary key values for O(1) duplicate checks
+        self._meta = SchemaMeta.from_table_schema(schema)
+        self._column_types = self._meta.col_types
         
         # Build primary key index
         if schema.primary_key:
@@ -21,22 +28,25 @@ class Table:
     
     def validate_row(self, row: Dict[str, Any]) -> bool:
         """Validate row against schema"""
+        meta = self._meta
+        
         # Check all required columns are present
-        for col in self.schema.columns:
-            if ConstraintType.NOT_NULL in col.constraints and col.name not in row:
-                raise ConstraintError(f"Column '{col.name}' cannot be NULL")
-            
-            if col.name in row:
-                value = row[col.name]
+        for col_name in meta.not_null:
+            if col_name not in row:
+                raise ConstraintError(f"Column '{col_name}' cannot be NULL")
+        
+        for col_name, data_type in meta.col_types.items():
+            if col_name in row:
+                value = row[col_name]
                 
                 # Type validation
-                if not self._validate_type(value, col.data_type):
-                    raise SchemaError(f"Invalid type for column '{col.name}': expected {col.data_type.value}")
+                if not self._validate_type(value, data_type):
+                    raise SchemaError(f"Invalid type for column '{col_name}': expected {data_type.value}")
                 
                 # Length validation for VARCHAR
-                if col.data_type == DataType.VARCHAR and col.max_length:
-                    if len(str(value)) > col.max_length:
-                        raise ConstraintError(f"Value too long for column '{col.name}': max {col.max_length}")
+                max_length = meta.max_lengths.get(col_name)
+                if max_length and len(str(value)) > max_length:
+                    raise ConstraintError(f"Value too long for column '{col_name}': max {max_length}")
         
         # Check primary key uniqueness
         if self.schema.primary_key and self.schema.primary_key in row:
@@ -73,73 +83,103 @@ class Table:
     
     def _pk_exists(self, pk_value: Any) -> bool:
         """Check if primary key value already exists"""
-        for row in self.rows:
-            if row.get(self.schema.primary_key) == pk_value:
-                return True
-        return False
+        return pk_value in self._pk_set
+    
+    def _rebuild_pk_set(self):
+        """Recompute primary key values from current rows"""
+        pk = self.schema.primary_key
+        self._pk_set = {row.get(pk) for row in self.rows.values()} if pk else set()
     
     def insert(self, row: Dict[str, Any]) -> int:
-        """Insert a validated row"""
+        """Insert a validated row, returning its rowid (the table keeps the dict; don't mutate it afterwards)"""
         self.validate_row(row)
         
         # Add row
-        self.rows.append(row.copy())
-        row_index = len(self.rows) - 1
+        rowid = self._next_rowid
+        self._next_rowid += 1
+        self.rows[rowid] = row
+        if self.schema.primary_key:
+            self._pk_set.add(row.get(self.schema.primary_key))
         
         # Update indexes
-        self._update_indexes(row, row_index)
+        self._update_indexes(row, rowid)
         
-        return row_index
+        return rowid
     
-    def _update_indexes(self, row: Dict[str, Any], row_index: int):
-        """Update all indexes for the table"""
+    def _update_indexes(self, row: Dict[str, Any], rowid: int):
+        """Add a row to all indexes of the table"""
         for col_name, index in self.indexes.items():
             if col_name in row:
-                value = row[col_name]
-                if value not in index:
-                    index[value] = []
-                index[value].append(row_index)
+                index.setdefault(row[col_name], set()).add(rowid)
+    
+    def _remove_from_indexes(self, row: Dict[str, Any], rowid: int):
+        """Drop a row from all indexes of the table"""
+        for col_name, index in self.indexes.items():
+            if col_name in row:
+                postings = index.get(row[col_name])
+                if postings is not None:
+                    postings.discard(rowid)
+                    if not postings:
+                        del index[row[col_name]]
+    
+    def _where_mask(self, where_clause: str) -> Optional[List[bool]]:
+        """Evaluate a WHERE clause once over every row (None if unparseable)"""
+        predicate = compile_where(where_clause, self._column_types)
+        if predicate is None:
+            return None
+        return [predicate(row) for row in self.rows.values()]
     
     def select(self, where_clause: Optional[str] = None) -> List[Dict[str, Any]]:
         """Select rows with optional filtering"""
         if where_clause is None:
-            return self.rows.copy()
+            return list(self.rows.values())
         
-        # Simple WHERE parsing
-        if '=' in where_clause:
-            col, value = where_clause.split('=', 1)
-            col = col.strip()
-            value = value.strip().strip("'")
-            
-            # Use index if available
-            if col in self.indexes:
-                row_indices = self.indexes[col].get(value, [])
-                return [self.rows[i] for i in row_indices]
-            
-            # Otherwise filter manually
-            return [row for row in self.rows if str(row.get(col, '')) == value]
+        # Use index if available for a single equality condition
+        conditions = parse_where(where_clause)
+        if len(conditions) == 1 and conditions[0][1] == '=' and conditions[0][0] in self.indexes:
+            col, _, value = conditions[0]
+            try:
+                value = coerce_value(value, self._column_types.get(col, DataType.TEXT))
+            except ValueError:
+                return []
+            # Rowids increase with insertion, so sorting restores table order
+            rowids = sorted(self.indexes[col].get(value, ()))
+            return [self.rows[rowid] for rowid in rowids]
         
-        return []
+        # Otherwise filter manually
+        mask = self._where_mask(where_clause)
+        if mask is None:
+            return []
+        return [row for row, hit in zip(self.rows.values(), mask) if hit]
     
     def update(self, set_clause: Dict[str, Any], where_clause: Optional[str] = None) -> int:
         """Update rows matching WHERE clause"""
-        updated_count = 0
+        if not where_clause:
+            mask = [True] * len(self.rows)
+        else:
+            mask = self._where_mask(where_clause)
+            if mask is None:
+                return 0
         
-        for i, row in enumerate(self.rows):
-            # Check WHERE condition
-            if where_clause and '=' in where_clause:
-                col, value = where_clause.split('=', 1)
-                col = col.strip()
-                value = value.strip().strip("'")
-                if str(row.get(col, '')) != value:
-                    continue
+        reindex = any(col in self.indexes for col in set_clause)
+        updated_count = 0
+        for (rowid, row), hit in zip(self.rows.items(), mask):
+            if not hit:
+                continue
             
-            # Update row
+            # Update row, moving it between index postings if needed
+            if reindex:
+                self._remove_from_indexes(row, rowid)
             for col, new_value in set_clause.items():
                 row[col] = new_value
+            if reindex:
+                self._update_indexes(row, rowid)
             
             updated_count += 1
         
+        if updated_count and self.schema.primary_key in set_clause:
+            self._rebuild_pk_set()
+        
         return updated_count
     
     def delete(self, where_clause: Optional[str] = None) -> int:
@@ -147,39 +187,25 @@ class Table:
         if where_clause is None:
             deleted_count = len(self.rows)
             self.rows.clear()
-            self.indexes.clear()
+            for index in self.indexes.values():
+                index.clear()
+            self._pk_set.clear()
             return deleted_count
         
-        # Simple WHERE parsing for equality
-        if '=' in where_clause:
-            col, value = where_clause.split('=', 1)
-            col = col.strip()
-            value = value.strip().strip("'")
-            
-            # Remove matching rows
-            new_rows = []
-            for row in self.rows:
-                if str(row.get(col, '')) != value:
-                    new_rows.append(row)
-            
-            deleted_count = len(self.rows) - len(new_rows)
-            self.rows = new_rows
-            
-            # Rebuild indexes
-            self._rebuild_indexes()
-            
-            return deleted_count
+        mask = self._where_mask(where_clause)
+        if mask is None:
+            return 0
         
-        return 0
-    
-    def _rebuild_indexes(self):
-        """Rebuild all indexes from current rows"""
-        self.indexes.clear()
-        if self.schema.primary_key:
-            self.indexes[self.schema.primary_key] = {}
+        # Remove matching rows and their index postings in place
+        doomed = [rowid for rowid, hit in zip(self.rows, mask) if hit]
+        pk = self.schema.primary_key
+        for rowid in doomed:
+            row = self.rows.pop(rowid)
+            self._remove_from_indexes(row, rowid)
+            if pk:
+                self._pk_set.discard(row.get(pk))
         
-        for i, row in enumerate(self.rows):
-            self._update_indexes(row, i)
+        return len(doomed)
     
     def create_index(self, column: str, index_type: str = "HASH"):
         """Create an index on a column"""
@@ -187,12 +213,10 @@ class Table:
             self.indexes[column] = {}
             
             # Build index from existing data
-            for i, row in enumerate(self.rows):
+            index = self.indexes[column]
+            for rowid, row in self.rows.items():
                 if column in row:
-                    value = row[column]
-                    if value not in self.indexes[column]:
-                        self.indexes[column][value] = []
-                    self.indexes[column][value].append(i)
+                    index.setdefault(row[column], set()).add(rowid)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get table statistics"""
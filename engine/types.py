@@ -2,8 +2,9 @@
 Type definitions and data structures for MyRDBMS
 """
 
-from typing import Dict, List, Any, Optional, Union
-from dataclasses import dataclass
+import sys
+from typing import Dict, List, Any, Optional, Union, Tuple, FrozenSet
+from dataclasses import dataclass, field
 from enum import Enum
 
 class DataType(Enum):
@@ -67,6 +68,62 @@ class TableSchema:
                 self.primary_key = col.name
                 break
 
+@dataclass(frozen=True)
+class SchemaMeta:
+    """Per-table facts derived once from a schema instead of on every row"""
+    column_names: Tuple[str, ...]
+    col_types: Dict[str, DataType]
+    pk: Optional[str] = None
+    not_null: FrozenSet[str] = frozenset()
+    unique: FrozenSet[str] = frozenset()
+    max_lengths: Dict[str, int] = field(default_factory=dict)
+    # Helpers derived from this schema (e.g. the executor's row builder);
+    # they are dropped together with the meta when the schema changes
+    plans: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+    
+    @classmethod
+    def from_table_schema(cls, schema: TableSchema) -> 'SchemaMeta':
+        """Build from an in-memory TableSchema"""
+        return cls(
+            column_names=tuple(sys.intern(col.name) for col in schema.columns),
+            col_types={col.name: col.data_type for col in schema.columns},
+            pk=schema.primary_key,
+            not_null=frozenset(col.name for col in schema.columns
+                               if ConstraintType.NOT_NULL in col.constraints),
+            unique=frozenset(col.name for col in schema.columns
+                             if ConstraintType.UNIQUE in col.constraints),
+            max_lengths={col.name: col.max_length for col in schema.columns
+                         if col.data_type == DataType.VARCHAR and col.max_length}
+        )
+    
+    @classmethod
+    def from_dict(cls, schema: Dict[str, Any]) -> Optional['SchemaMeta']:
+        """Build from a stored schema dict (None if it has no columns)"""
+        if not isinstance(schema, dict) or 'columns' not in schema:
+            return None
+        
+        column_defs = schema['columns']
+        col_types = {}
+        for col in column_defs:
+            try:
+                col_types[col['name']] = DataType(col.get('data_type', col.get('type', 'TEXT')))
+            except ValueError:
+                col_types[col['name']] = DataType.TEXT
+        
+        pk = next((col['name'] for col in column_defs
+                   if 'PRIMARY KEY' in col.get('constraints', [])), None)
+        return cls(
+            column_names=tuple(sys.intern(col['name']) for col in column_defs),
+            col_types=col_types,
+            pk=pk,
+            not_null=frozenset(col['name'] for col in column_defs
+                               if 'NOT NULL' in col.get('constraints', [])),
+            unique=frozenset(col['name'] for col in column_defs
+                             if 'UNIQUE' in col.get('constraints', [])),
+            max_lengths={col['name']: col['max_length'] for col in column_defs
+                         if col_types[col['name']] == DataType.VARCHAR and col.get('max_length')}
+        )
+
 @dataclass
 class QueryResult:
     """Standardized query result"""
@@ -0,0 +1,160 @@
+"""
+WHERE clause compiler for MyRDBMS
+Parses a WHERE clause once into a row predicate
+"""
+
+import re
+import operator
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from engine.types import DataType
+
+# Comparison operators; order matters for multi-char operators
+OPERATORS = {
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '=': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+_AND_SPLIT = re.compile(r'\s+AND\s+', re.IGNORECASE)
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+def parse_condition(clause: str) -> Optional[Tuple[str, str, str]]:
+    """Split 'col op value' into (col, op, value) with quotes removed"""
+    for op in OPERATORS:
+        if op in clause:
+            parts = clause.split(op)
+            if len(parts) == 2:
+                col = parts[0].strip()
+                value = parts[1].strip()
+                # Remove quotes if present
+                if (value.startswith("'") and value.endswith("'")) or \
+                   (value.startswith('"') and value.endswith('"')):
+                    value = value[1:-1]
+                if col:
+                    return col, op, value
+    return None
+
+def _split_and(where_clause: str) -> List[str]:
+    """Split an AND-chain, ignoring AND inside quoted literals"""
+    parts = []
+    start = 0
+    for match in _AND_SPLIT.finditer(where_clause):
+        if _in_quotes(where_clause[start:match.start()]):
+            continue
+        parts.append(where_clause[start:match.start()])
+        start = match.end()
+    parts.append(where_clause[start:])
+    return parts
+
+def _in_quotes(text: str) -> bool:
+    """Check whether text ends inside an unterminated quoted literal"""
+    quote = None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+    return quote is not None
+
+def parse_where(where_clause: str) -> List[Tuple[str, str, str]]:
+    """Parse an AND-chain of simple conditions (empty if any part is invalid)"""
+    conditions = []
+    for part in _split_and(where_clause.strip()):
+        condition = parse_condition(part)
+        if condition is None:
+            return []
+        conditions.append(condition)
+    return conditions
+
+def coerce_value(value: str, data_type: DataType) -> Any:
+    """Convert a WHERE literal to the column's Python type (raises ValueError)"""
+    if data_type == DataType.INT:
+        return int(value)
+    elif data_type == DataType.DECIMAL:
+        return float(value)
+    elif data_type == DataType.BOOLEAN:
+        lowered = value.lower()
+        if lowered in ('true', '1', 'yes', 't'):
+            return True
+        if lowered in ('false', '0', 'no', 'f'):
+            return False
+        raise ValueError(f"Invalid BOOLEAN literal: {value}")
+    return value
+
+def compile_where(where_clause: str,
+                  column_types: Optional[Dict[str, DataType]] = None) -> Optional[Predicate]:
+    """
+    Compile a WHERE clause into a predicate over row dicts.
+    Literals are converted once to the column type when it is known;
+    otherwise values are compared numerically when both sides parse as
+    numbers, falling back to string equality. Returns None if the clause
+    cannot be parsed.
+    """
+    conditions = parse_where(where_clause)
+    if not conditions:
+        return None
+
+    predicates = []
+    for col, op, value in conditions:
+        data_type = column_types.get(col) if column_types else None
+        predicate = None
+        if data_type is not None:
+            try:
+                predicate = _typed_predicate(col, OPERATORS[op], coerce_value(value, data_type))
+            except ValueError:
+                predicate = None
+        if predicate is None:
+            predicate = _untyped_predicate(col, op, value)
+        predicates.append(predicate)
+
+    if len(predicates) == 1:
+        return predicates[0]
+
+    predicates = tuple(predicates)
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+def _typed_predicate(col: str, compare: Callable, target: Any) -> Predicate:
+    """Compare a column against a literal already in the column's type"""
+    def predicate(row: Dict[str, Any]) -> bool:
+        row_value = row.get(col)
+        if row_value is None:
+            return False
+        try:
+            return compare(row_value, target)
+        except TypeError:
+            return False
+    return predicate
+
+def _untyped_predicate(col: str, op: str, value: str) -> Predicate:
+    """Compare numerically when possible, else by string equality"""
+    compare = OPERATORS[op]
+    equality_only = op in ('=', '!=')
+    try:
+        num_val = float(value)
+    except (ValueError, TypeError):
+        num_val = None
+
+    def predicate(row: Dict[str, Any]) -> bool:
+        # Skip if row doesn't have this column
+        if col not in row:
+            return False
+        row_value = row[col]
+
+        if num_val is not None:
+            if row_value is None:
+                return compare('', value)
+            try:
+                return compare(float(row_value), num_val)
+            except (ValueError, TypeError):
+                pass
+
+        # Last resort: string comparison (equality operators only)
+        str_row = str(row_value) if row_value is not None else ''
+        return equality_only and compare(str_row, value)
+
+    return predicate
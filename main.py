@@ -6,69 +6,94 @@ Run this file to start the database server and web interface
 
 import os
 import sys
+import socket
 import webbrowser
 from threading import Thread
 import time
 
-def start_api_server():
+STARTUP_BANNER = """
+    ╔══════════════════════════════════════════╗
+    ║         MyRDBMS - Starting...            ║
+    ╚══════════════════════════════════════════╝
+    
+"""
+
+READY_BANNER = "\n".join([
+    "",
+    "=" * 50,
+    "MyRDBMS is running!",
+    "=" * 50,
+    "1. API Server: http://localhost:5000/api",
+    "2. Web Interface: http://localhost:5000",
+    "3. Try these queries:",
+    "   - CREATE TABLE users (id INT, name VARCHAR(50))",
+    "   - INSERT INTO users VALUES (1, 'John')",
+    "   - SELECT * FROM users",
+    "=" * 50,
+    "",
+    ""
+])
+
+def start_api_server(app):
     """Start the Flask API server"""
-    from api.server import app
     print("Starting API server on http://localhost:5000")
-    app.run(debug=True, port=5000, use_reloader=False)
-
-def start_web_server():
-    """Start a simple web server for the frontend"""
-    import http.server
-    import socketserver
     
-    os.chdir('web-ui')  # Change to web-ui directory
+    # MYRDBMS_DEV=1 keeps the Werkzeug development server; asking for debug
+    # mode (MYRDBMS_DEBUG=1 or --debug) implies it, since waitress has none
+    from api.server import debug_requested
+    if os.environ.get('MYRDBMS_DEV') == '1' or debug_requested():
+        app.run(debug=debug_requested(), port=5000, use_reloader=False, threaded=True)
+        return
     
-    PORT = 3000
-    Handler = http.server.SimpleHTTPRequestHandler
-    
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        print(f"Web UI available at http://localhost:{PORT}")
-        webbrowser.open(f'http://localhost:{PORT}')
-        httpd.serve_forever()
+    # Production: waitress serves from a fixed thread pool in this process, so
+    # the single Storage and its caches are shared instead of forked per worker
+    from waitress import serve
+    serve(app, host='127.0.0.1', port=5000,
+          threads=16, connection_limit=1000, channel_timeout=30)
+
+def wait_for_api(host='127.0.0.1', port=5000, attempts=50, interval=0.05) -> bool:
+    """Poll the API port until it accepts a connection"""
+    for _ in range(attempts):
+        try:
+            with socket.create_connection((host, port), timeout=0.1):
+                return True
+        except OSError:
+            time.sleep(interval)
+    print(f"Warning: API server did not come up on port {port}")
+    return False
 
 def main():
     """Main entry point"""
-    print("""
-    ╔══════════════════════════════════════════╗
-    ║         MyRDBMS - Starting...            ║
-    ╚══════════════════════════════════════════╝
-    """)
+    # Import Flask and the engine up front, before any thread is running
+    from api.server import app, WEB_UI_DIR, DATA_DIR
+    
+    sys.stdout.write(STARTUP_BANNER)
+    sys.stdout.flush()
     
     # Create necessary directories
-    os.makedirs('data', exist_ok=True)
-    os.makedirs('web-ui', exist_ok=True)
+    os.makedirs(DATA_DIR, exist_ok=True)
     
-    # Check if web files exist
-    if not os.path.exists('web-ui/index.html'):
+    # Check if web files exist (served from the package's web-ui, not the cwd)
+    if not os.path.exists(os.path.join(WEB_UI_DIR, 'index.html')):
         print("Warning: web-ui/index.html not found")
         print("Make sure you have the web-ui files in place")
     
     # Start API server in a separate thread
-    api_thread = Thread(target=start_api_server, daemon=True)
+    api_thread = Thread(target=start_api_server, args=(app,), daemon=True)
     api_thread.start()
     
-    # Give API server time to start
-    time.sleep(2)
+    # Wait until the API server accepts connections (up to ~2.5s)
+    wait_for_api()
+    
+    sys.stdout.write(READY_BANNER)
+    sys.stdout.flush()
     
-    # Start web server
-    print("\n" + "="*50)
-    print("MyRDBMS is running!")
-    print("="*50)
-    print("1. API Server: http://localhost:5000")
-    print("2. Web Interface: http://localhost:3000")
-    print("3. Try these queries:")
-    print("   - CREATE TABLE users (id INT, name VARCHAR(50))")
-    print("   - INSERT INTO users VALUES (1, 'John')")
-    print("   - SELECT * FROM users")
-    print("="*50 + "\n")
+    webbrowser.open('http://localhost:5000')
     
     try:
-        start_web_server()
+        # The API thread also serves the web UI; keep the process alive with it
+        while api_thread.is_alive():
+            api_thread.join(0.5)
     except KeyboardInterrupt:
         print("\nShutting down MyRDBMS...")
         sys.exit(0)
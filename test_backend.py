@@ -1,27 +1,84 @@
 # test_backend.py
-import requests
+import sys
 import json
 
 BASE_URL = "http://localhost:5000/api"
 
-def test_backend():
+class InProcessClient:
+    """Calls the API through Flask's test client against a throwaway data directory"""
+    
+    def __init__(self):
+        import tempfile
+        import api.server as server
+        from engine.storage import Storage
+        self.server = server
+        self.client = server.app.test_client()
+        # Never touch the real web-ui/data databases
+        self.data_dir = tempfile.mkdtemp(prefix='myrdbms-test-')
+        self.saved_storage = server.storage
+        server.storage = Storage(self.data_dir)
+        server._result_cache.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        import shutil
+        self.server.storage = self.saved_storage
+        self.server._result_cache.clear()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+    
+    def get(self, path):
+        response = self.client.get(f"/api{path}")
+        return response.status_code, response.get_json()
+    
+    def post(self, path, payload):
+        response = self.client.post(f"/api{path}", json=payload)
+        return response.status_code, response.get_json()
+
+class LiveClient:
+    """Calls a running server over HTTP (--live), reusing one keep-alive connection"""
+    
+    def __init__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        self.session = requests.Session()
+        self.session.headers["Content-Type"] = "application/json"
+        # No retries: a failing call should show up at once, not after backoff
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16,
+                              max_retries=Retry(total=0, backoff_factor=0))
+        self.session.mount("http://", adapter)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.session.close()
+    
+    def get(self, path):
+        response = self.session.get(f"{BASE_URL}{path}")
+        return response.status_code, response.json()
+    
+    def post(self, path, payload):
+        response = self.session.post(f"{BASE_URL}{path}", json=payload)
+        return response.status_code, response.json()
+
+def test_backend(live=False):
+    with (LiveClient() if live else InProcessClient()) as client:
+        run_steps(client)
+
+def run_steps(client):
     print("Testing MyRDBMS Backend...")
     print("="*50)
     
-    # 1. Health check
-    print("1. Health check...")
-    response = requests.get(f"{BASE_URL}/health")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {response.json()}")
+    # 1. Create database
+    print("1. Creating database...")
+    status, body = client.post("/databases", {"name": "testdb"})
+    print(f"   Response: {body}")
     
-    # 2. Create database
-    print("\n2. Creating database...")
-    response = requests.post(f"{BASE_URL}/databases", 
-                           json={"name": "testdb"})
-    print(f"   Response: {response.json()}")
-    
-    # 3. Create table
-    print("\n3. Creating table...")
+    # 2. Create table
+    print("\n2. Creating table...")
     query = """
     CREATE TABLE users (
         id INT PRIMARY KEY,
@@ -30,40 +87,65 @@ def test_backend():
         age INT
     )
     """
-    response = requests.post(f"{BASE_URL}/databases/testdb/execute",
-                           json={"query": query})
-    print(f"   Response: {response.json()}")
+    status, body = client.post("/databases/testdb/execute", {"query": query})
+    print(f"   Response: {body}")
     
-    # 4. Insert data
-    print("\n4. Inserting data...")
+    # 3. Insert data
+    print("\n3. Inserting data...")
     queries = [
         "INSERT INTO users VALUES (1, 'John Doe', 'john@example.com', 30)",
         "INSERT INTO users VALUES (2, 'Jane Smith', 'jane@example.com', 25)"
     ]
     
     for query in queries:
-        response = requests.post(f"{BASE_URL}/databases/testdb/execute",
-                               json={"query": query})
-        print(f"   {query}: {response.json()}")
-    
-    # 5. Select data
-    print("\n5. Selecting data...")
-    response = requests.post(f"{BASE_URL}/databases/testdb/execute",
-                           json={"query": "SELECT * FROM users"})
-    result = response.json()
+        status, body = client.post("/databases/testdb/execute", {"query": query})
+        print(f"   {query}: {body}")
+    
+    # 4. Select data
+    print("\n4. Selecting data...")
+    status, result = client.post("/databases/testdb/execute", {"query": "SELECT * FROM users"})
     print(f"   Success: {result.get('success')}")
     print(f"   Message: {result.get('message')}")
     print(f"   Data: {result.get('data')}")
     print(f"   Columns: {result.get('columns')}")
     print(f"   Row count: {result.get('row_count')}")
     
-    # 6. Get schema
-    print("\n6. Getting schema...")
-    response = requests.get(f"{BASE_URL}/databases/testdb/tables/users/schema")
-    print(f"   Schema: {response.json()}")
+    # 5. Multi-row insert, update, then read the changes back
+    print("\n5. Inserting several rows, updating and deleting...")
+    query = ("INSERT INTO users VALUES (3, 'Bob Lee', 'bob@example.com', 41), "
+             "(4, 'Ann Wu', 'ann@example.com', 35)")
+    status, body = client.post("/databases/testdb/execute", {"query": query})
+    print(f"   {query}: {body}")
+    assert body.get('success') and body.get('row_count') == 2, body
+    
+    query = "UPDATE users SET age = 31 WHERE id = 1"
+    status, body = client.post("/databases/testdb/execute", {"query": query})
+    print(f"   {query}: {body}")
+    assert body.get('success') and body.get('row_count') == 1, body
+    
+    # A stale delta overlay or cached SELECT result would show the old age here
+    status, result = client.post("/databases/testdb/execute", {"query": "SELECT * FROM users"})
+    print(f"   Data after update: {result.get('data')}")
+    print(f"   Row count: {result.get('row_count')}")
+    assert result.get('row_count') == 4, result
+    ages = {str(row['id']): str(row['age']) for row in result['data']}
+    assert ages == {'1': '31', '2': '25', '3': '41', '4': '35'}, ages
+    
+    query = "DELETE FROM users WHERE id = 4"
+    status, body = client.post("/databases/testdb/execute", {"query": query})
+    print(f"   {query}: {body}")
+    assert body.get('success') and body.get('row_count') == 1, body
+    
+    # 6. Health check and schema, independent GETs sent as one batch
+    print("\n6. Health check and schema (batched)...")
+    status, body = client.post("/batch", ["/health", "/databases/testdb/tables/users/schema"])
+    health, schema = body['responses']
+    print(f"   Health status: {health['status']}")
+    print(f"   Health: {health['body']}")
+    print(f"   Schema: {schema['body']}")
     
     print("\n" + "="*50)
     print("Test complete!")
 
 if __name__ == "__main__":
-    test_backend()
\ No newline at end of file
+    test_backend(live='--live' in sys.argv)
@@ -0,0 +1,86 @@
+# test_storage.py
+import os
+import shutil
+import tempfile
+from engine.errors import StorageError
+from engine.storage import Storage
+
+def make_table(rows_per_frame=((1,), (2,), (3,))):
+    data_dir = tempfile.mkdtemp(prefix='myrdbms-test-')
+    storage = Storage(data_dir)
+    storage.create_database('db')
+    storage.save_table_schema('db', 't', {'name': 't', 'columns': [{'name': 'a', 'type': 'INT'}]})
+    for values in rows_per_frame:
+        storage.insert_rows('db', 't', [{'a': value} for value in values])
+    return data_dir, storage._table_paths('db', 't')
+
+def values(data_dir):
+    return [row['a'] for row in Storage(data_dir).get_all_rows('db', 't')]
+
+def test_frames_and_deltas_replay():
+    data_dir, paths = make_table()
+    try:
+        storage = Storage(data_dir)
+        storage.update_rows('db', 't', [{'index': 1, 'row': {'a': 20}}])
+        assert os.path.exists(paths.delta)
+        assert values(data_dir) == [1, 20, 3]
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_torn_tail_is_cut_before_next_append():
+    for cut in (1, 10, 30):
+        data_dir, paths = make_table()
+        try:
+            os.truncate(paths.data, os.path.getsize(paths.data) - cut)
+            assert values(data_dir) == [1, 2]
+
+            Storage(data_dir).insert_rows('db', 't', [{'a': 4}])
+            assert values(data_dir) == [1, 2, 4]
+            assert os.path.exists(paths.data + '.torn')
+        finally:
+            shutil.rmtree(data_dir)
+
+def test_torn_delta_tail():
+    data_dir, paths = make_table()
+    try:
+        storage = Storage(data_dir)
+        storage.update_rows('db', 't', [{'index': 0, 'row': {'a': 10}}])
+        storage.update_rows('db', 't', [{'index': 2, 'row': {'a': 30}}])
+        os.truncate(paths.delta, os.path.getsize(paths.delta) - 5)
+        assert values(data_dir) == [10, 2, 3]
+
+        Storage(data_dir).update_rows('db', 't', [{'index': 1, 'row': {'a': 20}}])
+        assert values(data_dir) == [10, 20, 3]
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_corrupt_frame_raises():
+    data_dir, paths = make_table()
+    try:
+        size = os.path.getsize(paths.data)
+        for offset in range(size - 1):
+            with open(paths.data, 'rb') as f:
+                original = f.read()
+            damaged = bytearray(original)
+            damaged[offset] ^= 0xFF
+            damaged[offset + 1] ^= 0x55
+            with open(paths.data, 'wb') as f:
+                f.write(damaged)
+            try:
+                Storage(data_dir).get_all_rows('db', 't')
+            except StorageError:
+                pass
+            else:
+                raise AssertionError(f"corruption at offset {offset} went unnoticed")
+            finally:
+                with open(paths.data, 'wb') as f:
+                    f.write(original)
+        assert values(data_dir) == [1, 2, 3]
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,46 @@
+# test_where.py
+from engine.types import DataType
+from engine.where import compile_where, parse_where
+
+ROWS = [
+    {'id': 1, 'name': 'Tom and Jerry', 'age': 30},
+    {'id': 2, 'name': 'Bob', 'age': 25},
+    {'id': 3, 'name': 'Ann', 'age': 41},
+]
+
+def matching_ids(where_clause, column_types=None):
+    predicate = compile_where(where_clause, column_types)
+    assert predicate is not None, where_clause
+    return [row['id'] for row in ROWS if predicate(row)]
+
+def test_single_conditions():
+    assert matching_ids("id = 2") == [2]
+    assert matching_ids("age > 26") == [1, 3]
+    assert matching_ids("age <= 30") == [1, 2]
+    assert matching_ids("name != 'Bob'") == [1, 3]
+
+def test_and_chain():
+    assert parse_where("age > 20 AND name = 'Ann'") == [('age', '>', '20'), ('name', '=', 'Ann')]
+    assert matching_ids("age > 20 and id < 3") == [1, 2]
+
+def test_quoted_and_stays_one_literal():
+    assert parse_where("name = 'Tom and Jerry'") == [('name', '=', 'Tom and Jerry')]
+    assert parse_where('name = "Tom AND Jerry" AND id = 1') == [('name', '=', 'Tom AND Jerry'), ('id', '=', '1')]
+    assert matching_ids("name = 'Tom and Jerry'") == [1]
+
+def test_unparseable_clause():
+    for where_clause in ("nonsense", "id = 1 = 2", "id = 1 AND nonsense"):
+        assert parse_where(where_clause) == []
+        assert compile_where(where_clause) is None
+
+def test_typed_comparison():
+    types = {'id': DataType.INT, 'age': DataType.INT}
+    assert matching_ids("age >= 30", types) == [1, 3]
+    # A literal that doesn't fit the column type falls back to untyped comparison
+    assert matching_ids("age = abc", types) == []
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"{name}: ok")